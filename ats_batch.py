@@ -0,0 +1,105 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from text_extraction import IMAGE_EXTENSIONS, SUPPORTED_EXTENSIONS
+
+# Files per worker task; their texts share one nlp.pipe pass
+CHUNK_SIZE = int(os.environ.get("ATS_BATCH_CHUNK", "16"))
+
+
+def find_resumes(path_or_glob):
+    """Return the resume files in a directory, or matching a glob pattern."""
+    if os.path.isdir(path_or_glob):
+        paths = []
+        for root, _, files in os.walk(path_or_glob):
+            paths.extend(os.path.join(root, name) for name in files)
+    else:
+        paths = glob.glob(path_or_glob, recursive=True)
+    return sorted(p for p in paths if os.path.splitext(p)[1].lower() in SUPPORTED_EXTENSIONS)
+
+
+def _init_worker(model_names):
+    from models import warm_up
+    warm_up(model_names)
+
+
+def _analyze_chunk(file_paths):
+    # One spaCy pass (nlp.pipe) over the whole chunk
+    from ats_general import analyze_resumes
+    try:
+        results = analyze_resumes(file_paths)
+    except Exception as e:
+        results = [{"error": str(e)} for _ in file_paths]
+    for file_path, result in zip(file_paths, results):
+        result["file"] = file_path
+    return results
+
+
+def analyze_batch(file_paths, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Score many resumes across a process pool, yielding results as soon as
+    their chunk is ready (completion order, not input order).
+    Args:
+        file_paths (list of str): Resume files to score.
+        workers (int): Number of worker processes (defaults to the CPU count).
+        chunk_size (int): Most files per task; each task runs spaCy over its
+            files in one batch. Smaller chunks are used so every worker gets work.
+    Yields:
+        dict: analyze_resume() output plus "file" and "extraction" timings, or {"file", "error"}.
+    """
+    model_names = ["nlp_scoring"]
+    if any(os.path.splitext(p)[1].lower() in IMAGE_EXTENSIONS for p in file_paths):
+        model_names.append("reader")
+    workers = workers or os.cpu_count() or 1
+    size = max(1, min(chunk_size, -(-len(file_paths) // workers)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_names,)) as executor:
+        futures = [executor.submit(_analyze_chunk, file_paths[i:i + size]) for i in range(0, len(file_paths), size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch ATS scoring; writes one JSON result per line.")
+    parser.add_argument("path", help="Directory of resumes or a glob pattern (quote it)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default: stdout)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Files per task, scored in one spaCy batch (default: {CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    file_paths = find_resumes(args.path)
+    if not file_paths:
+        print(f"No resumes found for {args.path}", file=sys.stderr)
+        sys.exit(1)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    done = failed = ocr_pages = 0
+    extract_seconds = ocr_seconds = 0.0
+    try:
+        for result in analyze_batch(file_paths, workers=args.workers, chunk_size=args.chunk_size):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            done += 1
+            failed += "error" in result
+            extraction = result.get("extraction", {})
+            extract_seconds += extraction.get("seconds", 0.0)
+            ocr_seconds += extraction.get("ocr_seconds", 0.0)
+            ocr_pages += extraction.get("ocr_pages", 0)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed else 0.0
+    print(f"Scored {done} resumes ({failed} failed) in {elapsed:.1f}s - {rate:.2f} files/sec", file=sys.stderr)
+    print(f"Text extraction: {extract_seconds - ocr_seconds:.1f}s worker time, "
+          f"plus {ocr_seconds:.1f}s OCR fallback for {ocr_pages} scanned PDF page(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,11 @@
 import sys
 import os
 import re
-import spacy
-from pdfminer.high_level import extract_text as extract_pdf_text
-from docx import Document
 from collections import defaultdict
-import easyocr
-
-# Load spaCy
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import subprocess
-    subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
-
-# Initialize EasyOCR reader (supports multiple languages)
-reader = easyocr.Reader(['en'])
+from models import get_scoring_nlp
+from docx_reader import read_docx
+from text_extraction import extract_raw_text
+from tracing import stage
 
 # --- PARAMETERS ---
 GENERIC_KEYWORDS = [
@@ -39,19 +28,8 @@ SECTION_PATTERNS = {
 DATE_PATTERN = r"((0[1-9]|1[0-2])\/\d{4}|(Jan(uary)?|Feb(ruary)?|Mar(ch)?|Apr(il)?|May|Jun(e)?|Jul(y)?|Aug(ust)?|Sep(tember)?|Oct(ober)?|Nov(ember)?|Dec(ember)?)\s+\d{4})"
 
 # --- EXTRACT TEXT ---
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".pdf":
-        text = extract_pdf_text(file_path)
-    elif ext == ".docx":
-        doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-    elif ext in [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]:
-        # OCR for image files using EasyOCR
-        results = reader.readtext(file_path, detail=0)  # detail=0 returns only text
-        text = "\n".join(results)
-    else:
-        raise ValueError("Unsupported file type. Only PDF, DOCX, and image files are supported.")
+def extract_text(file_path, use_cache=True, stats=None):
+    text = extract_raw_text(file_path, use_cache=use_cache, stats=stats)
     # Remove extra spaces, headers/footers (simple heuristic: repeated lines)
     lines = [line.strip() for line in text.splitlines() if line.strip()]
     freq = defaultdict(int)
@@ -73,32 +51,30 @@ def detect_sections(text):
     return found
 
 # --- FORMATTING & ATS COMPATIBILITY ---
-def check_formatting(file_path, text):
+def check_file_formatting(file_path):
     ext = os.path.splitext(file_path)[1].lower()
     issues = {
         "images": False,
         "tables": False,
-        "fonts": True,
-        "bullets": False,
-        "dates": False
+        "fonts": True
     }
     # Images/tables/fonts
     if ext == ".docx":
-        doc = Document(file_path)
-        issues["images"] = any(shape for shape in getattr(doc, "inline_shapes", []))
-        issues["tables"] = len(doc.tables) > 0
+        # Same parse as the text extraction (read once per file)
+        content = read_docx(file_path)
+        issues["images"] = content["images"] > 0
+        issues["tables"] = len(content["tables"]) > 0
         # Font check: look for more than 3 different fonts
-        fonts = set()
-        for para in doc.paragraphs:
-            for run in para.runs:
-                if run.font.name:
-                    fonts.add(run.font.name)
-        issues["fonts"] = len(fonts) <= 3
+        issues["fonts"] = len(content["fonts"]) <= 3
     elif ext == ".pdf":
         # pdfminer can't check images/tables easily, so flag as unknown
         issues["images"] = "unknown"
         issues["tables"] = "unknown"
         issues["fonts"] = True  # Assume OK
+    return issues
+
+def check_formatting(file_path, text):
+    issues = check_file_formatting(file_path)
     # Bullets
     issues["bullets"] = bool(re.search(r"^[\-\*\u2022]", text, re.MULTILINE))
     # Dates
@@ -106,8 +82,15 @@ def check_formatting(file_path, text):
     return issues
 
 # --- CONTENT QUALITY ---
-def analyze_content(text):
-    doc = nlp(text)
+def _sentence_features(doc):
+    # Passive voice (walk the sentences once for both counts)
+    sents = list(doc.sents)
+    return {
+        "passive_count": sum(1 for sent in sents for token in sent if token.dep_ == "auxpass"),
+        "total_sentences": len(sents)
+    }
+
+def _content_features(text, doc):
     # Action verbs at start of bullet points
     bullet_lines = [line.strip() for line in text.splitlines() if re.match(r"^[\-\*\u2022]", line.strip())]
     action_bullets = 0
@@ -117,19 +100,35 @@ def analyze_content(text):
             action_bullets += 1
     # Metrics/numbers
     metrics = len(re.findall(r'\b\d+[\d,\.]*\b', text))
-    # Passive voice
-    passive_count = sum(1 for sent in doc.sents for token in sent if token.dep_ == "auxpass")
     # Keywords
     keyword_count = sum(1 for kw in GENERIC_KEYWORDS if kw in text.lower())
+    sentences = _sentence_features(doc)
     return {
         "action_bullets": action_bullets,
         "metrics": metrics,
-        "passive_count": passive_count,
+        "passive_count": sentences["passive_count"],
         "keyword_count": keyword_count,
         "total_bullets": len(bullet_lines),
-        "total_sentences": len(list(doc.sents))
+        "total_sentences": sentences["total_sentences"]
     }
 
+def analyze_content(text):
+    return _content_features(text, get_scoring_nlp()(text))
+
+def analyze_contents(texts, batch_size=32, n_process=1):
+    """
+    Batched analyze_content() for many resumes, streamed through nlp.pipe.
+    Args:
+        texts (list of str): Extracted resume texts.
+        batch_size (int): Texts per spaCy batch.
+        n_process (int): spaCy worker processes (-1 for all CPUs).
+    Returns:
+        list of dict: One analyze_content() result per text, in input order.
+    """
+    texts = list(texts)
+    docs = get_scoring_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_content_features(text, doc) for text, doc in zip(texts, docs)]
+
 # --- READABILITY & STRUCTURE ---
 def check_readability(text):
     lines = [line.strip() for line in text.splitlines() if line.strip()]
@@ -153,6 +152,100 @@ def check_readability(text):
         "gaps": gaps
     }
 
+# --- SINGLE-PASS SCANNER ---
+# Compiled once; scan_text() applies them line by line in a single walk and
+# returns every regex-based feature that detect_sections, check_formatting,
+# analyze_content and check_readability compute with their own sweeps.
+BULLET_CHARS = ("-", "*", "\u2022")
+ACTION_VERB_SET = frozenset(ACTION_VERBS)
+SECTION_REGEXES = {section: re.compile(rf"\b{pattern}\b") for section, pattern in SECTION_PATTERNS.items()
+                   if section != "contact"}
+CONTACT_REGEXES = (
+    re.compile(r"\b(email|phone|linkedin|address)\b"),
+    re.compile(r"\b\d{10}\b"),
+    re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),
+)
+DATE_REGEX = re.compile(DATE_PATTERN, re.IGNORECASE)
+METRIC_REGEX = re.compile(r'\b\d+[\d,\.]*\b')
+YEAR_REGEX = re.compile(r'\b(19|20)\d{2}\b')
+JOB_REGEX = re.compile(r"(?i)(\b(manager|engineer|developer|analyst|consultant|designer|lead|intern|officer|specialist)\b.*?\b(19|20)\d{2}\b)")
+
+def scan_text(text):
+    """
+    Compute all text features used by generate_score/generate_suggestions
+    (except the spaCy sentence counts) in one walk over the lines.
+    Args:
+        text (str): Resume text as returned by extract_text().
+    Returns:
+        dict: {"sections", "formatting", "content", "readability"}, each
+        holding the same keys and values as the corresponding check function
+        (formatting without the file-level images/tables/fonts checks,
+        content without passive_count/total_sentences).
+    """
+    sections_left = dict(SECTION_REGEXES)
+    found = {"contact": False}
+    found.update((section, False) for section in SECTION_REGEXES)
+    keywords_left = set(GENERIC_KEYWORDS)
+    raw_bullets = dates = False
+    total_bullets = action_bullets = short_bullets = metrics = job_info = 0
+    years = []
+    for raw in text.splitlines():
+        if raw.startswith(BULLET_CHARS):
+            raw_bullets = True
+        line = raw.strip()
+        if not line:
+            continue
+        lower = line.lower()
+        for section, regex in list(sections_left.items()):
+            if regex.search(lower):
+                found[section] = True
+                del sections_left[section]
+        if not found["contact"]:
+            found["contact"] = any(regex.search(lower) for regex in CONTACT_REGEXES)
+        if keywords_left:
+            for kw in [kw for kw in keywords_left if kw in lower]:
+                keywords_left.discard(kw)
+        if line.startswith(BULLET_CHARS):
+            total_bullets += 1
+            words = line.lstrip("-*•").strip().split()
+            if words and words[0].lower() in ACTION_VERB_SET:
+                action_bullets += 1
+            if len(line) <= 240:
+                short_bullets += 1
+        if not dates and DATE_REGEX.search(line):
+            dates = True
+        metrics += len(METRIC_REGEX.findall(line))
+        line_years = YEAR_REGEX.findall(line)
+        if line_years:
+            years.extend(int(y) for y in line_years)
+            job_info += len(JOB_REGEX.findall(line))
+    if not dates:
+        # A "Month YYYY" date may still be split across two lines
+        dates = bool(DATE_REGEX.search(text))
+    chrono = all(earlier >= later for earlier, later in zip(years, years[1:])) if years else True
+    years_sorted = sorted(set(years), reverse=True)
+    gaps = any((years_sorted[i] - years_sorted[i+1]) > 1 for i in range(len(years_sorted)-1)) if len(years_sorted) > 1 else False
+    return {
+        "sections": found,
+        "formatting": {
+            "bullets": raw_bullets,
+            "dates": dates
+        },
+        "content": {
+            "action_bullets": action_bullets,
+            "metrics": metrics,
+            "keyword_count": len(GENERIC_KEYWORDS) - len(keywords_left),
+            "total_bullets": total_bullets
+        },
+        "readability": {
+            "short_bullets": short_bullets,
+            "total_bullets": total_bullets,
+            "chrono": chrono,
+            "job_info": job_info,
+            "gaps": gaps
+        }
+    }
+
 # --- SCORING ---
 def generate_score(sections, formatting, content, readability):
     breakdown = {}
@@ -289,11 +382,33 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
 
-def analyze_resume(file_path):
+def _text_and_file_features(file_path, text):
+    with stage("scan_text"):
+        features = scan_text(text)
+    with stage("file_formatting"):
+        formatting = check_file_formatting(file_path)
+    formatting.update(features["formatting"])
+    return features, formatting
+
+def _score_result(features, formatting, content):
+    sections = features["sections"]
+    readability = features["readability"]
+    with stage("score"):
+        score, breakdown, grade = generate_score(sections, formatting, content, readability)
+        suggestions = generate_suggestions(sections, formatting, content, readability)
+    return {
+        "score": score,
+        "breakdown": breakdown,
+        "grade": grade,
+        "suggestions": suggestions
+    }
+
+def analyze_resume(file_path, stats=None):
     """
     Analyze a resume file and return ATS score, breakdown, grade, and suggestions.
     Args:
         file_path (str): Path to the resume PDF or DOCX file.
+        stats (dict): Optional; receives the text extraction timings (see extract_raw_text).
     Returns:
         dict: {
             "score": int,
@@ -302,19 +417,41 @@ def analyze_resume(file_path):
             "suggestions": list of str
         }
     """
-    text = extract_text(file_path)
-    sections = detect_sections(text)
-    formatting = check_formatting(file_path, text)
-    content = analyze_content(text)
-    readability = check_readability(text)
-    score, breakdown, grade = generate_score(sections, formatting, content, readability)
-    suggestions = generate_suggestions(sections, formatting, content, readability)
-    return {
-        "score": score,
-        "breakdown": breakdown,
-        "grade": grade,
-        "suggestions": suggestions
-    }
+    with stage("analyze_resume", file=os.path.basename(file_path)):
+        text = extract_text(file_path, stats=stats)
+        features, formatting = _text_and_file_features(file_path, text)
+        with stage("spacy", chars=len(text)):
+            content = dict(features["content"], **_sentence_features(get_scoring_nlp()(text)))
+        return _score_result(features, formatting, content)
+
+def analyze_resumes(file_paths, batch_size=32):
+    """
+    analyze_resume() for many files at once: the texts go through spaCy
+    together via analyze_contents() (nlp.pipe) instead of one nlp() call each.
+    Args:
+        file_paths (list of str): Resume files.
+        batch_size (int): Texts per spaCy batch.
+    Returns:
+        list of dict: Per file, in input order: analyze_resume() output plus
+        "extraction" timings, or {"error": message} if the file couldn't be read.
+    """
+    results = [None] * len(file_paths)
+    pending = []
+    with stage("analyze_resumes", files=len(file_paths)):
+        for i, file_path in enumerate(file_paths):
+            extraction = {}
+            try:
+                text = extract_text(file_path, stats=extraction)
+                features, formatting = _text_and_file_features(file_path, text)
+            except Exception as e:
+                results[i] = {"error": str(e)}
+                continue
+            pending.append((i, text, features, formatting, extraction))
+        with stage("spacy", chars=sum(len(item[1]) for item in pending)):
+            contents = analyze_contents([item[1] for item in pending], batch_size=batch_size)
+        for (i, _, features, formatting, extraction), content in zip(pending, contents):
+            results[i] = dict(_score_result(features, formatting, content), extraction=extraction)
+    return results
 
 # Keep the CLI main for direct execution
 if __name__ == "__main__":
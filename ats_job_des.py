@@ -1,21 +1,10 @@
 import os
 import re
-import spacy
-import google.generativeai as genai
-from pdfminer.high_level import extract_text as extract_pdf_text
-from docx import Document
 import pytesseract
 from PIL import Image
-import easyocr
-
-# Load spaCy
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import subprocess
-    import sys
-    subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+from text_extraction import extract_raw_text
+from gemini_client import generate_text, generate_text_async
+from tracing import stage
 
 # Canonical section names mapped to header variations
 SECTION_HEADERS = {
@@ -57,52 +46,48 @@ SECTION_HEADERS = {
     ]
 }
 
-# Flatten for fast lookup
-HEADER_TO_SECTION = {}
-for canonical, variations in SECTION_HEADERS.items():
-    for v in variations:
-        HEADER_TO_SECTION[v.lower()] = canonical
-
-
-# Initialize EasyOCR reader (supports multiple languages)
-reader = easyocr.Reader(['en'])
-
-def extract_text_from_file(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+def build_header_index(section_headers):
+    """Flatten {canonical: [variations]} into {variation: canonical} for lookup."""
+    header_index = {}
+    for canonical, variations in section_headers.items():
+        for v in variations:
+            header_index[v.strip().lower()] = canonical
+    return header_index
 
-    if ext == ".pdf":
-        text = extract_pdf_text(file_path)
-
-    elif ext == ".docx":
-        doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
+# Flatten for fast lookup
+HEADER_TO_SECTION = build_header_index(SECTION_HEADERS)
 
-    elif ext in [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]:
-        # OCR for image files using EasyOCR
-        results = reader.readtext(file_path, detail=0)  # detail=0 returns only text
-        text = "\n".join(results)
+# A header line is the header itself followed only by spaces, ":" or "-".
+HEADER_SUFFIX = re.compile(r"[\s:\-]+$")
 
-    else:
-        raise ValueError("Unsupported file type. Only PDF, DOCX, and image files are supported.")
 
-    return text
+def extract_text_from_file(file_path, use_cache=True):
+    return extract_raw_text(file_path, use_cache=use_cache)
 
 
-def match_section(line):
-    line_clean = line.strip().lower()
-    for header, canonical in HEADER_TO_SECTION.items():
-        # Match header at start of line, allow for ":" or "-" after header
-        if re.match(rf"^{re.escape(header)}\b[\s:\-]*$", line_clean):
-            return canonical
-    return None
+def match_section(line, header_index=None):
+    # The whole line must be a header (plus optional ":" or "-"), so strip the
+    # suffix once and do a single dict lookup instead of one regex per header.
+    line_clean = HEADER_SUFFIX.sub("", line.strip().lower())
+    if not line_clean:
+        return None
+    return (header_index or HEADER_TO_SECTION).get(line_clean)
 
-def split_sections(text):
+def split_sections(text, header_index=None):
+    """
+    Split resume text into {canonical section: content}.
+    Args:
+        text (str): Raw resume text.
+        header_index (dict): Optional {header variation: canonical} vocabulary,
+            e.g. from build_header_index(); defaults to HEADER_TO_SECTION.
+    """
+    header_index = header_index or HEADER_TO_SECTION
     lines = text.splitlines()
     sections = {}
     current_section = "Other"
     buffer = []
     for line in lines:
-        matched = match_section(line)
+        matched = match_section(line, header_index)
         if matched:
             if buffer:
                 sections[current_section] = "\n".join(buffer).strip()
@@ -120,12 +105,49 @@ def format_resume_for_gemini(sections):
         formatted.append(f"--- {sec.upper()} ---\n{content.strip()}\n")
     return "\n".join(formatted)
 
-def get_ats_score_from_gemini(resume_path, job_description, gemini_api_key):
-    raw_text = extract_text_from_file(resume_path)
-    sections = split_sections(raw_text)
-    formatted_resume = format_resume_for_gemini(sections)
-
-    prompt = f"""
+class ParsedResume:
+    """A resume extracted and split into sections once, reusable by every workflow step."""
+
+    def __init__(self, raw_text, sections, path=None):
+        self.path = path
+        self.raw_text = raw_text
+        self.sections = sections
+        self.formatted = format_resume_for_gemini(sections)
+
+    @classmethod
+    def from_path(cls, file_path):
+        with stage("parse_resume"):
+            raw_text = extract_text_from_file(file_path)
+            with stage("split_sections"):
+                sections = split_sections(raw_text)
+            return cls(raw_text, sections, path=file_path)
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Parse resume text as given (e.g. a server request). Text already in
+        "--- SECTION ---" blocks, the format of .formatted, keeps its blocks;
+        anything else is split on its section headers.
+        """
+        # latex_renderer imports this module, so its parser is imported here
+        from latex_renderer import HEADER_BLOCK, canonical_section, parse_sectioned_text
+        blocks = parse_sectioned_text(text)
+        if not blocks:
+            return cls(text, split_sections(text))
+        sections = {}
+        for title, content in blocks:
+            name = "Other" if title == HEADER_BLOCK else canonical_section(title) or title.title()
+            sections[name] = f"{sections[name]}\n{content}" if name in sections else content
+        return cls(text, sections)
+
+def parse_resume(resume):
+    """Return a ParsedResume for a file path, or the resume itself if it is already parsed."""
+    if isinstance(resume, ParsedResume):
+        return resume
+    return ParsedResume.from_path(resume)
+
+def build_ats_score_prompt(formatted_resume, job_description):
+    return f"""
 You are an ATS (Applicant Tracking System) expert.
 Given the following RESUME and JOB DESCRIPTION, analyze the resume for ATS-friendliness and job match.
 Return your response in this concise, WhatsApp-friendly format (no #, *, or bullet points, use only numbers and headings):
@@ -145,12 +167,22 @@ JOB DESCRIPTION:
 Respond in the above format, using only numbers and headings, no extra text.
 """
 
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-    response = model.generate_content(prompt)
-    return response.text.strip()
+def get_ats_score_from_gemini(resume, job_description, gemini_api_key):
+    with stage("ats_job_score"):
+        prompt = build_ats_score_prompt(parse_resume(resume).formatted, job_description)
+        return generate_text(prompt, gemini_api_key).strip()
+
+def parse_ats_score(ats_feedback):
+    """The numeric score from Gemini's ATS feedback (0 if it can't be found)."""
+    match = re.search(r'ATS score\s*[:\-]?\s*(\d+)', ats_feedback, re.IGNORECASE)
+    return int(match.group(1)) if match else 0
+
+async def get_ats_score_from_gemini_async(resume, job_description, gemini_api_key):
+    prompt = build_ats_score_prompt(parse_resume(resume).formatted, job_description)
+    return (await generate_text_async(prompt, gemini_api_key)).strip()
 
 # Example usage:
 # gemini_api_key = "YOUR_GEMINI_API_KEY"
-# ats_feedback = get_ats_score_from_gemini("resume.pdf", "Job description text here", gemini_api_key)
+# resume = parse_resume("resume.pdf")  # or pass the path directly
+# ats_feedback = get_ats_score_from_gemini(resume, "Job description text here", gemini_api_key)
 # print(ats_feedback)
\ No newline at end of file
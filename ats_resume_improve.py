@@ -1,12 +1,10 @@
-import google.generativeai as genai
-from ats_job_des import extract_text_from_file, split_sections, format_resume_for_gemini
+from ats_job_des import parse_resume
+from gemini_client import generate_text, generate_text_async, stream_text
+from latex_renderer import SECTION_MARKER
+from tracing import stage
 
-def improve_resume_with_gemini(resume_path, job_description, gemini_api_key):
-    raw_text = extract_text_from_file(resume_path)
-    sections = split_sections(raw_text)
-    formatted_resume = format_resume_for_gemini(sections)
-
-    prompt = f"""
+def build_improve_prompt(formatted_resume, job_description):
+    return f"""
 You are an expert resume writer and ATS optimizer.
 Given the following RESUME and JOB DESCRIPTION, suggest improvements and rewrite the resume to achieve an ATS score of 70+.
 
@@ -29,7 +27,30 @@ First, list suggestions for improvement as numbered lines (one line each, concis
 Then, provide the improved resume in the same sectioned format.
 """
 
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-    response = model.generate_content(prompt)
-    return response.text.strip()
\ No newline at end of file
+def split_suggestions(response):
+    """
+    Split an improve response into (suggestions, improved resume): the
+    numbered suggestions come before the first "--- SECTION ---" block.
+    """
+    marker = SECTION_MARKER.search(response)
+    if not marker:
+        return "", response.strip()
+    return response[:marker.start()].strip(), response[marker.start():].strip()
+
+def improve_resume_with_gemini(resume, job_description, gemini_api_key):
+    with stage("improve_resume"):
+        prompt = build_improve_prompt(parse_resume(resume).formatted, job_description)
+        return generate_text(prompt, gemini_api_key).strip()
+
+async def improve_resume_with_gemini_async(resume, job_description, gemini_api_key):
+    prompt = build_improve_prompt(parse_resume(resume).formatted, job_description)
+    return (await generate_text_async(prompt, gemini_api_key)).strip()
+
+def improve_resume_with_gemini_stream(resume, job_description, gemini_api_key, stats=None):
+    """
+    Like improve_resume_with_gemini(), but yields the response as it arrives.
+    The "improve_resume" stage stays open until the generator finishes or is closed.
+    """
+    with stage("improve_resume"):
+        prompt = build_improve_prompt(parse_resume(resume).formatted, job_description)
+        yield from stream_text(prompt, gemini_api_key, stats=stats)
\ No newline at end of file
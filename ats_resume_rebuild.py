@@ -1,8 +1,10 @@
-import google.generativeai as genai
-from ats_job_des import extract_text_from_file, split_sections, format_resume_for_gemini
+from concurrent.futures import ThreadPoolExecutor
+from ats_job_des import parse_resume
+from gemini_client import generate_text, generate_text_async, stream_text
+from tracing import stage
 
-def find_resume_gaps_with_gemini(formatted_resume, job_title, job_description, gemini_api_key):
-    prompt = f"""
+def build_gaps_prompt(formatted_resume, job_title, job_description):
+    return f"""
 You are an ATS and resume expert.
 Given the RESUME and JOB TITLE/DESCRIPTION, list the top 3-5 most important missing or weak sections, projects, or skills that would improve the resume for this job.
 For each, write a short question to ask the user if they have this experience or project.
@@ -17,62 +19,83 @@ JOB TITLE:
 JOB DESCRIPTION:
 {job_description}
 """
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-    response = model.generate_content(prompt)
-    return [line.strip().split('. ', 1)[1] for line in response.text.strip().split('\n') if '. ' in line]
 
-def get_user_or_gemini_answer(question, job_title, job_description, gemini_api_key):
-    print(f"\n{question}\nType 'yes' to provide your own details, or 'no' to let the system add an attractive example for your resume:")
-    user_has = input().strip().lower()
-    if user_has == "yes":
-        print("Please provide a short description/details for this (1-2 lines):")
-        user_detail = input().strip()
-        prompt = f"""
+def _parse_questions(response_text):
+    return [line.strip().split('. ', 1)[1] for line in response_text.strip().split('\n') if '. ' in line]
+
+def find_resume_gaps_with_gemini(formatted_resume, job_title, job_description, gemini_api_key):
+    prompt = build_gaps_prompt(formatted_resume, job_title, job_description)
+    return _parse_questions(generate_text(prompt, gemini_api_key))
+
+async def find_resume_gaps_with_gemini_async(formatted_resume, job_title, job_description, gemini_api_key):
+    prompt = build_gaps_prompt(formatted_resume, job_title, job_description)
+    return _parse_questions(await generate_text_async(prompt, gemini_api_key))
+
+def build_user_detail_prompt(user_detail, job_title, job_description):
+    return f"""
 Rewrite the following user-provided detail as a strong, concise resume bullet or section for a {job_title} resume, matching the style of the rest of the resume. Do not use *, #, or bullet points, just a single line.
 User detail: {user_detail}
 Job description: {job_description}
 """
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
-        response = model.generate_content(prompt)
-        # Robust error handling
-        if hasattr(response, "text") and response.text and response.text.strip():
-            return response.text.strip()
-        else:
-            print("Gemini did not return a response. Using your input as-is.")
-            return user_detail
-    else:
-        prompt = f"""
+
+def build_example_prompt(job_title, job_description):
+    return f"""
 Generate a strong, relevant project/skill/experience for a {job_title} resume, based on the following job description. Do not use *, #, or bullet points, just a single line.
 Job description: {job_description}
 """
-        genai.configure(api_key=gemini_api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
-        response = model.generate_content(prompt)
-        # Robust error handling
-        if hasattr(response, "text") and response.text and response.text.strip():
-            return response.text.strip()
-        else:
-            print("Gemini did not return a response. Using a default example.")
-            return f"Relevant {job_title} project or skill (details not provided)."
-
-def rebuild_resume_with_gemini(resume_path, job_title, job_description, gemini_api_key):
-    raw_text = extract_text_from_file(resume_path)
-    sections = split_sections(raw_text)
-    formatted_resume = format_resume_for_gemini(sections)
 
-    # Step 1: Find gaps/questions
-    questions = find_resume_gaps_with_gemini(formatted_resume, job_title, job_description, gemini_api_key)
-    new_items = []
+def _user_detail_or_fallback(text, user_detail):
+    # Robust error handling
+    if text and text.strip():
+        return text.strip()
+    print("Gemini did not return a response. Using your input as-is.")
+    return user_detail
+
+def _example_or_fallback(text, job_title):
+    # Robust error handling
+    if text and text.strip():
+        return text.strip()
+    print("Gemini did not return a response. Using a default example.")
+    return f"Relevant {job_title} project or skill (details not provided)."
+
+def rewrite_user_detail_with_gemini(user_detail, job_title, job_description, gemini_api_key):
+    text = generate_text(build_user_detail_prompt(user_detail, job_title, job_description), gemini_api_key)
+    return _user_detail_or_fallback(text, user_detail)
+
+async def rewrite_user_detail_with_gemini_async(user_detail, job_title, job_description, gemini_api_key):
+    text = await generate_text_async(build_user_detail_prompt(user_detail, job_title, job_description), gemini_api_key)
+    return _user_detail_or_fallback(text, user_detail)
+
+# The example prompt is the same for every gap question, so it bypasses the
+# response cache; a cached reply would repeat one example for each gap.
+def generate_example_with_gemini(job_title, job_description, gemini_api_key):
+    text = generate_text(build_example_prompt(job_title, job_description), gemini_api_key, use_cache=False)
+    return _example_or_fallback(text, job_title)
 
-    # Step 2: For each gap, ask user or generate
-    for q in questions:
-        answer = get_user_or_gemini_answer(q, job_title, job_description, gemini_api_key)
-        new_items.append(answer)
+async def generate_example_with_gemini_async(job_title, job_description, gemini_api_key):
+    text = await generate_text_async(build_example_prompt(job_title, job_description), gemini_api_key, use_cache=False)
+    return _example_or_fallback(text, job_title)
 
-    # Step 3: Rebuild resume with new items
-    prompt = f"""
+def ask_user_about_gap(question):
+    """Ask the user about one gap; returns their detail, or None to let Gemini generate an example."""
+    print(f"\n{question}\nType 'yes' to provide your own details, or 'no' to let the system add an attractive example for your resume:")
+    user_has = input().strip().lower()
+    if user_has == "yes":
+        print("Please provide a short description/details for this (1-2 lines):")
+        return input().strip()
+    return None
+
+def _answer_gap(user_detail, job_title, job_description, gemini_api_key):
+    if user_detail is not None:
+        return rewrite_user_detail_with_gemini(user_detail, job_title, job_description, gemini_api_key)
+    return generate_example_with_gemini(job_title, job_description, gemini_api_key)
+
+def get_user_or_gemini_answer(question, job_title, job_description, gemini_api_key):
+    user_detail = ask_user_about_gap(question)
+    return _answer_gap(user_detail, job_title, job_description, gemini_api_key)
+
+def build_rebuild_prompt(formatted_resume, job_title, job_description, new_items):
+    return f"""
 You are an expert resume builder and ATS optimizer.
 Given the following RESUME, JOB TITLE, JOB DESCRIPTION, and NEW ITEMS, rebuild the resume to be highly relevant and ATS-friendly for this job.
 
@@ -106,7 +129,65 @@ NEW ITEMS TO ADD:
 {chr(10).join([f"{i+1}. {item}" for i, item in enumerate(new_items)])}
 """
 
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-    response = model.generate_content(prompt)
-    return response.text.strip()
\ No newline at end of file
+def rebuild_resume_from_items_with_gemini(resume, job_title, job_description, new_items, gemini_api_key):
+    prompt = build_rebuild_prompt(parse_resume(resume).formatted, job_title, job_description, new_items)
+    with stage("rebuild_from_items", items=len(new_items)):
+        return generate_text(prompt, gemini_api_key).strip()
+
+async def rebuild_resume_from_items_with_gemini_async(resume, job_title, job_description, new_items, gemini_api_key):
+    prompt = build_rebuild_prompt(parse_resume(resume).formatted, job_title, job_description, new_items)
+    return (await generate_text_async(prompt, gemini_api_key)).strip()
+
+def rebuild_resume_from_items_with_gemini_stream(resume, job_title, job_description, new_items, gemini_api_key, stats=None):
+    prompt = build_rebuild_prompt(parse_resume(resume).formatted, job_title, job_description, new_items)
+    with stage("rebuild_from_items", items=len(new_items)):
+        yield from stream_text(prompt, gemini_api_key, stats=stats)
+
+def collect_new_items(resume, job_title, job_description, gemini_api_key, answer_gap=ask_user_about_gap):
+    """
+    Ask Gemini for the resume's gaps, then ask the user (or Gemini) to fill each one.
+    Args:
+        answer_gap (callable): Takes a gap question and returns the user's detail,
+            or None for a Gemini example; defaults to asking on the console.
+    """
+    # Step 1: Find gaps/questions
+    with stage("find_gaps"):
+        questions = find_resume_gaps_with_gemini(resume.formatted, job_title, job_description, gemini_api_key)
+    new_items = []
+
+    # Step 2: For each gap, ask user or generate. Each Gemini call starts in
+    # the background as soon as its answer is known, so the user keeps
+    # answering while earlier calls are still in flight.
+    if not questions:
+        return new_items
+    # The span includes time spent waiting for the user's answers
+    with stage("gap_answers", questions=len(questions)), ThreadPoolExecutor(max_workers=len(questions)) as executor:
+        pending = []
+        for q in questions:
+            user_detail = answer_gap(q)
+            pending.append(executor.submit(_answer_gap, user_detail, job_title, job_description, gemini_api_key))
+        # Only wait on whatever is still outstanding, keeping question order
+        for future in pending:
+            new_items.append(future.result())
+    return new_items
+
+def rebuild_resume_with_gemini(resume, job_title, job_description, gemini_api_key, answer_gap=ask_user_about_gap):
+    with stage("rebuild_resume"):
+        resume = parse_resume(resume)
+        new_items = collect_new_items(resume, job_title, job_description, gemini_api_key, answer_gap=answer_gap)
+
+        # Step 3: Rebuild resume with new items
+        return rebuild_resume_from_items_with_gemini(resume, job_title, job_description, new_items, gemini_api_key)
+
+def rebuild_resume_with_gemini_stream(resume, job_title, job_description, gemini_api_key, stats=None,
+                                      answer_gap=ask_user_about_gap):
+    """
+    Like rebuild_resume_with_gemini(): once iteration starts the gap questions
+    are asked, then the rebuilt resume is yielded in chunks as it arrives.
+    The "rebuild_resume" stage stays open until the generator finishes or is closed.
+    """
+    with stage("rebuild_resume"):
+        resume = parse_resume(resume)
+        new_items = collect_new_items(resume, job_title, job_description, gemini_api_key, answer_gap=answer_gap)
+        yield from rebuild_resume_from_items_with_gemini_stream(resume, job_title, job_description, new_items,
+                                                                gemini_api_key, stats=stats)
@@ -0,0 +1,43 @@
+import argparse
+import time
+
+from ats_general import _content_features, analyze_contents
+from benchmarks.samples import sample_corpus
+from models import get_nlp, get_scoring_nlp
+
+# Compare analyze_content() on the full en_core_web_sm pipeline (one nlp() call
+# per resume) with the trimmed scoring pipeline fed through nlp.pipe, as
+# ats_batch does for each chunk of files (via analyze_resumes()).
+# Run from the repo root: python -m benchmarks.bench_content
+
+
+def _rate(label, count, seconds):
+    print(f"{label:<40} {count / seconds:8.1f} docs/sec  ({seconds:.2f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = sample_corpus(args.count)
+    full_nlp = get_nlp()
+    get_scoring_nlp()  # load outside the timed region
+
+    start = time.perf_counter()
+    before = [_content_features(text, full_nlp(text)) for text in texts]
+    _rate("full pipeline, nlp(text) per resume", len(texts), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    after = analyze_contents(texts, batch_size=args.batch_size, n_process=args.n_process)
+    _rate(f"scoring pipeline, nlp.pipe(batch={args.batch_size}, n_process={args.n_process})",
+          len(texts), time.perf_counter() - start)
+
+    mismatches = sum(1 for a, b in zip(before, after) if a != b)
+    print(f"results differing between pipelines: {mismatches}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
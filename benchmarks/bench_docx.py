@@ -0,0 +1,81 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+try:
+    from docx import Document
+except ImportError:  # python-docx is no longer a runtime dependency
+    Document = None
+
+from benchmarks.samples import write_sample_docx
+from docx_reader import _read_docx, read_docx
+
+# DOCX text plus formatting checks: the old code loaded the file with
+# python-docx twice (text, then tables/images/fonts); read_docx() streams
+# word/document.xml once and never decompresses the media parts.
+# Peak memory is what tracemalloc sees (Python allocations, not lxml's).
+# The legacy columns and the parity check need python-docx (pip install
+# python-docx); without it only the streaming reader is timed.
+# Run: python -m benchmarks.bench_docx
+
+
+def _legacy(path):
+    doc = Document(path)
+    text = "\n".join(para.text for para in doc.paragraphs)
+    doc = Document(path)
+    fonts = {run.font.name for para in doc.paragraphs for run in para.runs if run.font.name}
+    return text, len(doc.tables), len(doc.inline_shapes), fonts
+
+
+def _streaming(path):
+    _read_docx.cache_clear()
+    content = read_docx(path)
+    text = "\n".join(content["paragraphs"])
+    content = read_docx(path)  # the formatting check hits the in-process cache
+    return text, len(content["tables"]), content["images"], content["fonts"]
+
+
+def _measure(func, path, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(path)
+    seconds = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--media-mb", type=int, nargs="+", default=[0, 20])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if Document is None:
+        print("python-docx is not installed: skipping the legacy timings and the parity check "
+              "(pip install python-docx to compare).")
+    work_dir = tempfile.mkdtemp(prefix="bench_docx_")
+    print(f"{'copies':>6} {'media MB':>8} {'legacy ms':>10} {'legacy MB':>10} {'stream ms':>10} {'stream MB':>10} {'same':>5}")
+    for copies in args.copies:
+        for media_mb in args.media_mb:
+            path = write_sample_docx(os.path.join(work_dir, f"resume_{copies}_{media_mb}.docx"),
+                                     copies=copies, media_mb=media_mb)
+            stream, stream_s, stream_mb = _measure(_streaming, path, args.repeat)
+            if Document is None:
+                legacy_cols = f"{'-':>10} {'-':>10}"
+                same = "-"
+            else:
+                legacy, legacy_s, legacy_mb = _measure(_legacy, path, args.repeat)
+                legacy_cols = f"{legacy_s * 1000:10.1f} {legacy_mb:10.1f}"
+                same = str(legacy == stream)
+            print(f"{copies:6d} {media_mb:8d} {legacy_cols} "
+                  f"{stream_s * 1000:10.1f} {stream_mb:10.1f} {same:>5}")
+
+
+if __name__ == "__main__":
+    main()
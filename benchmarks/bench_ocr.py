@@ -0,0 +1,59 @@
+import argparse
+import time
+
+from models import get_reader
+from ocr import ocr_images
+
+# Image-resume OCR: the old path handed the original file to EasyOCR one image
+# at a time; ocr_images() normalises and downscales first and can batch
+# several images per call. Defaults to the sample images in the repo root.
+# Run: python -m benchmarks.bench_ocr [images...]
+
+
+def _legacy(paths):
+    reader = get_reader()
+    texts, seconds = [], []
+    for path in paths:
+        start = time.perf_counter()
+        texts.append("\n".join(reader.readtext(path, detail=0)))
+        seconds.append(time.perf_counter() - start)
+    return texts, seconds
+
+
+def _similarity(a, b):
+    # Word-level overlap, to catch settings that lose text
+    a, b = set(a.lower().split()), set(b.lower().split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("images", nargs="*", default=["deepak.png", "shubham.jpg"])
+    parser.add_argument("--max-side", type=int, nargs="+", default=[0, 2000, 1600, 1200])
+    parser.add_argument("--images-per-batch", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--paragraph", action="store_true")
+    args = parser.parse_args()
+
+    get_reader()  # keep model loading out of the timings
+    baseline, legacy_s = _legacy(args.images)
+    print(f"legacy readtext: {sum(legacy_s):.2f}s total")
+    for path, seconds in zip(args.images, legacy_s):
+        print(f"  {path}: {seconds:.2f}s")
+
+    print(f"{'max side':>9} {'per batch':>10} {'total s':>8} {'prepare s':>10} {'similarity':>11}")
+    for max_side in args.max_side:
+        for per_batch in args.images_per_batch:
+            timings = []
+            start = time.perf_counter()
+            texts = ocr_images(args.images, max_side=max_side, images_per_batch=per_batch,
+                               paragraph=args.paragraph, timings=timings)
+            total = time.perf_counter() - start
+            prepare = sum(t["prepare"] for t in timings)
+            similarity = min(_similarity(a, b) for a, b in zip(baseline, texts))
+            print(f"{max_side or 'full':>9} {per_batch:10d} {total:8.2f} {prepare:10.2f} {similarity:11.2f}")
+            for path, t in zip(args.images, timings):
+                print(f"    {path}: {t['total']:.2f}s {t['shape']}")
+
+
+if __name__ == "__main__":
+    main()
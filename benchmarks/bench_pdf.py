@@ -0,0 +1,64 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from pdfminer.high_level import extract_text
+
+from benchmarks.samples import write_sample_pdf
+from pdf_text import iter_pdf_pages
+
+# Long-PDF text extraction: pdfminer's extract_text() (what extract_raw_text
+# used to call) against iter_pdf_pages() with a page cap, without layout
+# analysis and with worker processes. Time and peak memory come from separate
+# runs (tracing slows pdfminer down a lot); peak memory covers this process
+# only, so it is not reported for the multi-process rows. Workers are capped
+# at the CPU count, so on a single CPU the workers row runs in-process.
+# Run: python -m benchmarks.bench_pdf [--pages 5 50 200]
+
+
+def _measure(func, trace=True):
+    start = time.perf_counter()
+    text = func()
+    seconds = time.perf_counter() - start
+    if not trace:
+        return text, seconds, None
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return text, seconds, peak
+
+
+def _pages_text(file_path, **options):
+    return "".join((text or "") + "\f" for _, text in iter_pdf_pages(file_path, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pdf_")
+    print(f"{'pages':>6} {'variant':<22} {'seconds':>8} {'peak MB':>8} {'same text':>10}")
+    for pages in args.pages:
+        pdf_path = write_sample_pdf(os.path.join(work_dir, f"resume_{pages}p.pdf"), pages=pages)
+        baseline, seconds, peak = _measure(lambda: extract_text(pdf_path))
+        print(f"{pages:6d} {'extract_text':<22} {seconds:8.2f} {peak:8.1f} {'-':>10}")
+        variants = [
+            ("iter_pdf_pages", {}),
+            (f"max_pages={args.max_pages}", {"max_pages": args.max_pages}),
+            ("layout off", {"layout": False}),
+            (f"workers={args.workers}", {"workers": args.workers}),
+        ]
+        for name, options in variants:
+            text, seconds, peak = _measure(lambda: _pages_text(pdf_path, **options), trace="workers" not in options)
+            peak = f"{peak:8.1f}" if peak is not None else f"{'-':>8}"
+            print(f"{pages:6d} {name:<22} {seconds:8.2f} {peak} {str(text == baseline):>10}")
+
+
+if __name__ == "__main__":
+    main()
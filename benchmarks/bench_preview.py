@@ -0,0 +1,66 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pdf2image import convert_from_path
+
+from latex_to_pdf import compile_latex
+from pdf_to_image import render_pages, render_previews
+
+# First-page preview cost versus PDF length: the old pdf_to_image rasterised
+# every page before saving pages[0]; render_pages() only rasterises page 1.
+# Needs pdflatex and poppler. Run: python -m benchmarks.bench_preview
+
+
+def _multipage_latex(pages):
+    body = "\n".join(f"\\section*{{Page {i + 1}}}\n{'Lorem ipsum dolor sit amet. ' * 60}\n\\newpage"
+                     for i in range(pages))
+    return f"\\documentclass{{article}}\n\\begin{{document}}\n{body}\n\\end{{document}}\n"
+
+
+def _pixels(images):
+    # Decoded size of the images held in memory at once
+    return sum(image.width * image.height * len(image.getbands()) for image in images)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--dpi", type=int, default=200)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_preview_")
+    pdfs = []
+    for pages in args.pages:
+        pdf_path = os.path.join(work_dir, f"resume_{pages}p.pdf")
+        if not compile_latex(_multipage_latex(pages), pdf_path)["ok"]:
+            raise SystemExit("pdflatex failed; is it installed?")
+        pdfs.append((pages, pdf_path))
+
+    print(f"{'pages':>6} {'all pages s':>12} {'all MB':>8} {'page 1 s':>9} {'page 1 MB':>10}")
+    for pages, pdf_path in pdfs:
+        start = time.perf_counter()
+        legacy = convert_from_path(pdf_path, dpi=args.dpi)
+        legacy_s, legacy_mb = time.perf_counter() - start, _pixels(legacy) / 1e6
+        del legacy
+        start = time.perf_counter()
+        first = render_pages(pdf_path, (1,), dpi=args.dpi)
+        first_s, first_mb = time.perf_counter() - start, _pixels(first) / 1e6
+        print(f"{pages:6d} {legacy_s:12.2f} {legacy_mb:8.1f} {first_s:9.2f} {first_mb:10.1f}")
+
+    # Four copies of each PDF under the same name in separate directories
+    paths = []
+    for copy in range(4):
+        os.makedirs(os.path.join(work_dir, f"copy_{copy}"), exist_ok=True)
+        for _, pdf_path in pdfs:
+            paths.append(shutil.copy(pdf_path, os.path.join(work_dir, f"copy_{copy}")))
+    for workers in (1, 4):
+        start = time.perf_counter()
+        render_previews(paths, os.path.join(work_dir, f"previews_{workers}"), thumbnail=True, workers=workers)
+        print(f"{len(paths)} thumbnails with {workers} worker(s): {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+
+from ats_job_des import split_sections
+from benchmarks.samples import sample_corpus
+from job_match import match_jobs, rank_resumes, score_job_match
+
+# Ranking a pool of candidates against one job: score_job_match() called once
+# per resume versus rank_resumes() scoring the whole pool in one batch of
+# array operations; then the reverse, one resume against many jobs with
+# match_jobs(). Resumes are pre-split, so only the matching is timed.
+# Run from the repo root: python -m benchmarks.bench_rank
+
+JOB_DESCRIPTION = """Backend Developer
+We are looking for a backend developer to build and run our data platform.
+Requirements: Python, SQL, Docker, Kubernetes, AWS, Git; REST API design; CI/CD pipelines.
+Nice to have: React, machine learning, data modelling, mentoring junior engineers.
+You will own the billing service, the search index and the release process."""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--counts", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'resumes':>8} {'per-resume s':>13} {'batched s':>10} {'resumes/sec':>12}")
+    for count in args.counts:
+        pool = [split_sections(text) for text in sample_corpus(count)]
+
+        start = time.perf_counter()
+        for sections in pool:
+            score_job_match(sections, JOB_DESCRIPTION)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranked = rank_resumes(pool, JOB_DESCRIPTION)
+        batched = time.perf_counter() - start
+        print(f"{count:>8} {single:13.3f} {batched:10.3f} {count / batched:12.0f}")
+
+    print(f"\nTop {args.top} of the last pool:")
+    for row in ranked[:args.top]:
+        print(f"  #{row['rank']:<3} resume {row['index']:<5} score {row['score']:5.1f}  "
+              f"similarity {row['similarity']:.3f}  sections {row['sections']}")
+
+    # Job descriptions: the sample job with its skills line varied per job
+    resume = split_sections(sample_corpus(1)[0])
+    skills = ["Python", "SQL", "Docker", "Kubernetes", "AWS", "Git", "React", "Java", "Go", "Terraform", "Spark"]
+    print(f"\n{'jobs':>8} {'per-job s':>13} {'batched s':>10} {'jobs/sec':>12}")
+    for count in args.counts:
+        jobs = [JOB_DESCRIPTION.replace("Python, SQL", ", ".join(skills[i % len(skills):][:4]))
+                for i in range(count)]
+
+        start = time.perf_counter()
+        for job in jobs:
+            score_job_match(resume, job)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        match_jobs(resume, jobs)
+        batched = time.perf_counter() - start
+        print(f"{count:>8} {single:13.3f} {batched:10.3f} {count / batched:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import time
+
+from ats_general import (_content_features, check_formatting, check_readability, detect_sections,
+                         generate_score, generate_suggestions, scan_text)
+from benchmarks.samples import sample_corpus
+
+# Parity check and throughput of scan_text() against the separate
+# detect_sections/check_formatting/analyze_content/check_readability sweeps.
+# spaCy is left out on both sides (it is shared and unchanged), so the
+# sentence-based content fields are zero here. Run: python -m benchmarks.bench_scanner
+
+
+class _NoSentences:
+    sents = ()
+
+
+def _legacy_features(text):
+    return {
+        "sections": detect_sections(text),
+        "formatting": check_formatting("resume.txt", text),
+        "content": _content_features(text, _NoSentences()),
+        "readability": check_readability(text),
+    }
+
+
+def _scanner_features(text):
+    features = scan_text(text)
+    formatting = {"images": False, "tables": False, "fonts": True}
+    formatting.update(features["formatting"])
+    return {
+        "sections": features["sections"],
+        "formatting": formatting,
+        "content": dict(features["content"], passive_count=0, total_sentences=0),
+        "readability": features["readability"],
+    }
+
+
+def _edge_cases():
+    return [
+        "",
+        "Skills\nPython",
+        "Worked at Acme from May\n2021 to June\n2023",
+        "  - indented bullet\n* star bullet\n• dot bullet\n-\n",
+        "Engineer at Globex 2019 and manager 2015\nlead 2012 2011 2008",
+        "contact me: someone@example.com\n9876543210\nteamwork, leadership and communication",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--count", type=int, default=500)
+    args = parser.parse_args()
+
+    texts = sample_corpus(args.count, max_jobs=12) + _edge_cases()
+    mismatches = 0
+    for text in texts:
+        legacy = _legacy_features(text)
+        scanned = _scanner_features(text)
+        args_legacy = (legacy["sections"], legacy["formatting"], legacy["content"], legacy["readability"])
+        args_scanned = (scanned["sections"], scanned["formatting"], scanned["content"], scanned["readability"])
+        if legacy != scanned or generate_score(*args_legacy) != generate_score(*args_scanned) or \
+                generate_suggestions(*args_legacy) != generate_suggestions(*args_scanned):
+            mismatches += 1
+    print(f"parity: {len(texts) - mismatches}/{len(texts)} resumes identical")
+
+    total_bytes = sum(len(text) for text in texts)
+    for label, fn in (("separate sweeps", _legacy_features), ("scan_text", _scanner_features)):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        seconds = time.perf_counter() - start
+        print(f"{label:<16} {len(texts) / seconds:9.0f} resumes/sec  {total_bytes / seconds / 1e6:6.2f} MB/sec")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
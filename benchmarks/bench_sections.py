@@ -0,0 +1,75 @@
+import argparse
+import re
+import time
+
+from ats_job_des import HEADER_TO_SECTION, SECTION_HEADERS, build_header_index, split_sections
+from benchmarks.samples import sample_resume_text
+
+# split_sections() with the previous per-header regex loop versus the compiled
+# suffix strip + dict lookup, on resumes of growing length and with a large
+# user-supplied header vocabulary. Run: python -m benchmarks.bench_sections
+
+
+def _legacy_match_section(line, header_index):
+    line_clean = line.strip().lower()
+    for header, canonical in header_index.items():
+        if re.match(rf"^{re.escape(header)}\b[\s:\-]*$", line_clean):
+            return canonical
+    return None
+
+
+def _legacy_split_sections(text, header_index):
+    sections = {}
+    current_section = "Other"
+    buffer = []
+    for line in text.splitlines():
+        matched = _legacy_match_section(line, header_index)
+        if matched:
+            if buffer:
+                sections[current_section] = "\n".join(buffer).strip()
+                buffer = []
+            current_section = matched
+        else:
+            buffer.append(line)
+    if buffer:
+        sections[current_section] = "\n".join(buffer).strip()
+    return sections
+
+
+def _large_vocabulary(size):
+    headers = {canonical: list(variations) for canonical, variations in SECTION_HEADERS.items()}
+    canonicals = list(headers)
+    for i in range(size):
+        headers[canonicals[i % len(canonicals)]].append(f"custom header variant {i}")
+    return build_header_index(headers)
+
+
+def _time(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vocabulary", type=int, default=2000, help="Extra header variants to add")
+    args = parser.parse_args()
+
+    vocabularies = [("default", HEADER_TO_SECTION), (f"+{args.vocabulary}", _large_vocabulary(args.vocabulary))]
+    print(f"{'vocab':>8} {'lines':>7} {'legacy s':>10} {'compiled s':>11} {'lines/sec':>12}")
+    for name, header_index in vocabularies:
+        for jobs in (5, 40, 320):
+            text = sample_resume_text(seed=jobs, jobs=jobs, bullets_per_job=6)
+            lines = len(text.splitlines())
+            new, new_s = _time(split_sections, text, header_index)
+            if name == "default" or jobs == 5:
+                old, old_s = _time(_legacy_split_sections, text, header_index)
+                assert old == new, "split_sections output differs from the legacy matcher"
+                legacy = f"{old_s:10.4f}"
+            else:
+                legacy = f"{'skipped':>10}"
+            print(f"{name:>8} {lines:7d} {legacy} {new_s:11.4f} {lines / new_s:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import glob
+import json
+import os
+import random
+import re
+
+from benchmarks.samples import sample_resume_text, write_sample_docx, write_sample_image, write_sample_pdf
+
+# Reproducible corpus of synthetic PDF, DOCX and image resumes of varying
+# length. The text comes from the repo's rebuilt_resume_*.tex files (turned
+# back into plain resume lines) padded with generated sample resumes, so the
+# same seed always writes the same files.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_PATTERN = os.path.join(ROOT, "rebuilt_resume_*.tex")
+FORMATS = ("pdf", "docx", "png")
+LENGTHS = (1, 2, 4)
+LINES_PER_PAGE = 45
+# Image resumes are single pages; longer ones only get denser
+MAX_IMAGE_LINES = 70
+
+_COMMENT = re.compile(r"(?<!\\)%.*$")
+_SPACING = re.compile(r"\\(?:vspace|hspace|raisebox)\*?\{[^}]*\}")
+_HREF = re.compile(r"\\href\{[^}]*\}\{([^}]*)\}")
+_COMMAND = re.compile(r"\\[A-Za-z]+\*?(\[[^\]]*\])?")
+_SPECIALS = re.compile(r"\\([&%$#_{}])")
+
+
+def _tex_to_text(value):
+    value = _HREF.sub(r"\1", value)
+    value = _SPECIALS.sub(r"\1", value)
+    value = _COMMAND.sub(" ", value)
+    value = re.sub(r"[{}$~]|--", " ", value.replace("\\\\", " ").replace("\\ ", " "))
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def tex_seed_lines(tex_path):
+    """Turn a rebuilt resume .tex file back into plain resume lines."""
+    with open(tex_path, encoding="utf-8") as f:
+        tex = f.read()
+    start = tex.find("\\begin{document}")
+    body = tex[start + len("\\begin{document}"):tex.rfind("\\end{document}")] if start != -1 else tex
+    lines = []
+    for raw in body.splitlines():
+        raw = _SPACING.sub(" ", _COMMENT.sub("", raw)).strip()
+        if not raw:
+            continue
+        section = re.match(r"\\section\{(.+)\}", raw)
+        if section:
+            lines.append(_tex_to_text(section.group(1)))
+        elif raw.startswith(("\\resumeItem{", "\\item")):
+            text = _tex_to_text(raw.split("{", 1)[1] if raw.startswith("\\resumeItem{") else raw[len("\\item"):])
+            if text:
+                lines.append(f"- {text}")
+        elif raw.startswith("{"):
+            # \resumeSubheading arguments: keep the non-empty fields on one line
+            fields = [_tex_to_text(field) for field in re.findall(r"\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}", raw)]
+            if any(fields):
+                lines.append(" | ".join(field for field in fields if field))
+        else:
+            text = _tex_to_text(raw)
+            if text and not raw.startswith(("\\begin", "\\end", "\\resume")):
+                lines.append(text)
+    return lines
+
+
+def corpus_lines(pages, seed):
+    """Seed resume lines padded with sample resumes to about `pages` pages."""
+    rng = random.Random(seed)
+    seeds = sorted(glob.glob(SEED_PATTERN))
+    lines = tex_seed_lines(seeds[seed % len(seeds)]) if seeds else []
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines += sample_resume_text(seed=rng.randint(0, 10 ** 6), jobs=rng.randint(2, 5)).splitlines()
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def build_corpus(output_dir, formats=FORMATS, lengths=LENGTHS, per_length=2, seed=0):
+    """
+    Write the corpus and a manifest.json describing it.
+    Returns:
+        list of dict: One {"path", "format", "pages", "seed"} entry per file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = []
+    for fmt in formats:
+        for pages in lengths:
+            for i in range(per_length):
+                file_seed = seed * 1000 + pages * 10 + i
+                lines = corpus_lines(pages, file_seed)
+                path = os.path.join(output_dir, f"resume_{pages}p_{i}.{fmt}")
+                if fmt == "pdf":
+                    write_sample_pdf(path, lines=lines, lines_per_page=LINES_PER_PAGE)
+                elif fmt == "docx":
+                    write_sample_docx(path, seed=file_seed, lines=lines)
+                else:
+                    write_sample_image(path, lines[:MAX_IMAGE_LINES])
+                manifest.append({"path": path, "format": fmt, "pages": pages, "seed": file_seed})
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from ats_general import _sentence_features, check_file_formatting, extract_text, generate_score, \
+    generate_suggestions, scan_text
+from ats_job_des import format_resume_for_gemini, split_sections
+from benchmarks.corpus import FORMATS, LENGTHS, ROOT, build_corpus
+from docx_reader import _read_docx
+from latex_renderer import render_latex_resume
+from latex_template import latex_template
+from latex_to_pdf import LATEX_ENGINE, compile_latex
+from models import get_reader, get_scoring_nlp
+
+# Offline end-to-end benchmark: builds the synthetic corpus, times every stage
+# of the scoring and LaTeX pipeline per file, and writes machine-readable
+# results. --compare reports per-stage changes against an earlier results file
+# and exits non-zero on a regression. No Gemini calls are made.
+# Run: python -m benchmarks.run -o results.json
+#      python -m benchmarks.run --compare results.json
+
+STAGES = ("extract", "sections", "spacy", "scoring", "latex_render", "latex_compile")
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _score(file_path, text, sentence_features):
+    # analyze_resume() without the extraction and spaCy steps
+    features = scan_text(text)
+    formatting = check_file_formatting(file_path)
+    formatting.update(features["formatting"])
+    content = dict(features["content"], **sentence_features)
+    score = generate_score(features["sections"], formatting, content, features["readability"])
+    generate_suggestions(features["sections"], formatting, content, features["readability"])
+    return score[0]
+
+
+def run_file(entry, latex=True, compile_pdf=True):
+    """Time each stage once for one corpus file; returns {stage: seconds} and details."""
+    path = entry["path"]
+    # Start each run cold: no in-process DOCX parse to reuse
+    _read_docx.cache_clear()
+    times = {}
+    extraction = {}
+    text, times["extract"] = _timed(extract_text, path, use_cache=False, stats=extraction)
+    sections, times["sections"] = _timed(split_sections, text)
+    formatted = format_resume_for_gemini(sections)
+    nlp = get_scoring_nlp()
+    sentence_features, times["spacy"] = _timed(lambda: _sentence_features(nlp(text)))
+    score, times["scoring"] = _timed(_score, path, text, sentence_features)
+    if latex:
+        document, times["latex_render"] = _timed(render_latex_resume, formatted, latex_template)
+        if document and compile_pdf:
+            result, times["latex_compile"] = _timed(compile_latex, document)
+            if not result["ok"]:
+                del times["latex_compile"]
+    details = {"chars": len(text), "section_count": len(sections), "score": score,
+               "ocr_seconds": extraction.get("ocr_seconds", 0.0)}
+    return times, details
+
+
+def summarize(files):
+    """Per-stage, per-format timing statistics (seconds)."""
+    summary = {}
+    for stage in STAGES:
+        for fmt in sorted({f["format"] for f in files}):
+            values = sorted(f["stages"][stage] for f in files if f["format"] == fmt and stage in f["stages"])
+            if not values:
+                continue
+            summary.setdefault(stage, {})[fmt] = {
+                "n": len(values),
+                "total": sum(values),
+                "mean": statistics.mean(values),
+                "median": statistics.median(values),
+                "p95": values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))],
+            }
+    return summary
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, timeout=10).stdout.decode().strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def run(args):
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix="resume_corpus_")
+    manifest = build_corpus(corpus_dir, formats=args.formats, lengths=args.lengths,
+                            per_length=args.per_length, seed=args.seed)
+    latex = not args.no_latex
+    compile_pdf = latex and shutil.which(LATEX_ENGINE) is not None
+    if latex and not compile_pdf:
+        print(f"{LATEX_ENGINE} not found; skipping the LaTeX compile stage.", file=sys.stderr)
+
+    # Model loading is reported once, outside the per-file stages
+    setup = {}
+    _, setup["load_spacy"] = _timed(get_scoring_nlp)
+    if "png" in args.formats:
+        _, setup["load_easyocr"] = _timed(get_reader)
+
+    files = []
+    for entry in manifest:
+        runs = [run_file(entry, latex=latex, compile_pdf=compile_pdf) for _ in range(args.repeat)]
+        stages = {stage: statistics.median(times[stage] for times, _ in runs)
+                  for stage in STAGES if all(stage in times for times, _ in runs)}
+        files.append(dict(entry, stages=stages, **runs[-1][1]))
+        print(f"{os.path.basename(entry['path']):<22} " +
+              " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in stages.items()), file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "latex_compile": compile_pdf,
+        },
+        "setup": setup,
+        "summary": summarize(files),
+        "files": files,
+    }
+
+
+def compare(results, baseline, threshold=0.2, min_delta=0.001):
+    """
+    Print median changes per stage and format against a baseline results file.
+    Returns:
+        list of str: The stage/format pairs that got slower by more than threshold
+        (and by at least min_delta seconds).
+    """
+    regressions = []
+    print(f"{'stage':<14} {'format':<6} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for stage, formats in results["summary"].items():
+        for fmt, current in formats.items():
+            old = baseline.get("summary", {}).get(stage, {}).get(fmt)
+            if not old:
+                continue
+            before, after = old["median"], current["median"]
+            change = (after - before) / before if before else 0.0
+            flag = change > threshold and after - before >= min_delta
+            if flag:
+                regressions.append(f"{stage}/{fmt}")
+            print(f"{stage:<14} {fmt:<6} {before * 1000:12.1f} {after * 1000:11.1f} {change:+8.0%}"
+                  f"{'  REGRESSION' if flag else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline per-stage benchmark on a synthetic resume corpus.")
+    parser.add_argument("--corpus", help="Directory for the generated corpus (default: a temp dir)")
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(LENGTHS), help="Resume lengths in pages")
+    parser.add_argument("--per-length", type=int, default=2, help="Files per format and length")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file; the median is kept")
+    parser.add_argument("--no-latex", action="store_true", help="Skip the LaTeX render and compile stages")
+    parser.add_argument("-o", "--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    elif not args.compare:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, threshold=args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
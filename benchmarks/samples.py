@@ -0,0 +1,186 @@
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ats_general import ACTION_VERBS, GENERIC_KEYWORDS
+
+# Deterministic plain-text resumes for benchmarks, in the shape extract_text() returns.
+
+TITLES = ["Software Engineer", "Data Analyst", "Product Manager", "Backend Developer",
+          "Research Intern", "ML Engineer", "QA Specialist", "DevOps Consultant"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+NOUNS = ["pipeline", "dashboard", "API", "test suite", "data model", "release process",
+         "onboarding flow", "search index", "billing service", "ETL job"]
+
+
+def sample_resume_text(seed=0, jobs=3, bullets_per_job=4):
+    rng = random.Random(seed)
+    lines = [
+        "Jane Doe",
+        "Email: jane.doe@example.com | Phone: 9876543210 | LinkedIn: linkedin.com/in/janedoe",
+        "Summary",
+        f"{rng.choice(TITLES)} focused on {', '.join(rng.sample(GENERIC_KEYWORDS, 3))}.",
+        "Skills",
+        "Python, SQL, Docker, Kubernetes, React, AWS, Git",
+        "Professional Experience",
+    ]
+    year = 2024
+    for _ in range(jobs):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} "
+                     f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}")
+        for _ in range(bullets_per_job):
+            verb = rng.choice(ACTION_VERBS).capitalize()
+            if rng.random() < 0.2:
+                lines.append(f"- The {rng.choice(NOUNS)} was maintained by the team for {rng.randint(2, 40)} clients.")
+            else:
+                lines.append(f"- {verb} the {rng.choice(NOUNS)}, cutting latency by {rng.randint(5, 80)}% "
+                             f"for {rng.randint(100, 90000):,} users.")
+        year = start
+    lines += [
+        "Education",
+        f"B.Tech in Computer Science, State University {year - 4} - {year}",
+        "Projects",
+        f"- Built a {rng.choice(NOUNS)} used by {rng.randint(10, 500)} people.",
+        "Certifications",
+        "AWS Certified Developer 06/2023",
+    ]
+    return "\n".join(lines)
+
+
+def sample_corpus(count=100, seed=0, max_jobs=8):
+    rng = random.Random(seed)
+    return [sample_resume_text(seed=seed + i, jobs=rng.randint(1, max_jobs)) for i in range(count)]
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _sample_lines(count, seed):
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < count:
+        lines += sample_resume_text(seed=rng.randint(0, 10 ** 6), jobs=4).splitlines()
+    return lines
+
+
+def write_sample_pdf(path, pages=1, seed=0, lines_per_page=45, lines=None):
+    """
+    Write a plain Helvetica PDF of resume text (no TeX needed).
+    Args:
+        lines (list of str): Text to lay out; generated sample text if None.
+            Pages are added until every line is placed.
+    """
+    if lines is None:
+        lines = _sample_lines(pages * lines_per_page, seed)
+    # The standard Type1 fonts only cover Latin-1
+    lines = [line.encode("latin-1", "replace").decode("latin-1") for line in lines]
+    pages = max(1, -(-len(lines) // lines_per_page))
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in range(pages):
+        chunk = lines[page * lines_per_page:(page + 1) * lines_per_page]
+        stream = "BT /F1 10 Tf 14 TL 50 780 Td " + " ".join(f"{_pdf_string(line)} '" for line in chunk) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(out)
+    return path
+
+
+DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Default Extension="png" ContentType="image/png"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+</Types>"""
+DOCX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+DOCX_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rIdImg1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image1.png"/>
+</Relationships>"""
+DOCX_INLINE_IMAGE = ('<w:p><w:r><w:drawing><wp:inline><wp:extent cx="914400" cy="914400"/><wp:docPr id="1" name="Picture 1"/>'
+                     '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+                     '<pic:pic><pic:blipFill><a:blip r:embed="rIdImg1"/></pic:blipFill></pic:pic>'
+                     '</a:graphicData></a:graphic></wp:inline></w:drawing></w:r></w:p>')
+
+
+def write_sample_docx(path, seed=0, copies=1, media_mb=0, lines=None):
+    """
+    Write a DOCX of resume text (zipfile only, no python-docx).
+    Args:
+        copies (int): Sample resumes concatenated into the body, for long documents.
+        media_mb (int): Size of an embedded image part, in MB (0 = no image).
+        lines (list of str): Text to use instead of generated sample resumes.
+    """
+    rng = random.Random(seed)
+    if lines is None:
+        lines = []
+        for _ in range(copies):
+            lines += sample_resume_text(seed=rng.randint(0, 10 ** 6), jobs=4).splitlines()
+    paragraphs = []
+    for line in lines:
+        font = rng.choice(["Arial", "Calibri", ""])
+        run_props = f'<w:rPr><w:rFonts w:ascii="{font}"/></w:rPr>' if font else ""
+        paragraphs.append(f"<w:p><w:r>{run_props}<w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>")
+    cells = "".join(f"<w:tc><w:p><w:r><w:t>{skill}</w:t></w:r></w:p></w:tc>" for skill in ("Python", "SQL", "Docker"))
+    paragraphs.insert(len(paragraphs) // 2, f"<w:tbl><w:tr>{cells}</w:tr></w:tbl>")
+    if media_mb:
+        paragraphs.insert(1, DOCX_INLINE_IMAGE)
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+                'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+                'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+                'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<w:body>{"".join(paragraphs)}</w:body></w:document>')
+    parts = [("[Content_Types].xml", DOCX_CONTENT_TYPES), ("_rels/.rels", DOCX_RELS), ("word/document.xml", document)]
+    if media_mb:
+        # Random bytes stand in for a photo: incompressible, like real media
+        parts += [("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS),
+                  ("word/media/image1.png", rng.randbytes(media_mb * 1024 * 1024))]
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in parts:
+            # Fixed timestamps keep the same seed byte-for-byte identical
+            info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_STORED if name.startswith("word/media/") else zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+    return path
+
+
+def write_sample_image(path, lines, width=1275, font_size=22, margin=60):
+    """Render resume lines onto a white page image (about 150 dpi for letter width)."""
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow < 10.1 has only the small bitmap font
+        font = ImageFont.load_default()
+    line_height = int(font_size * 1.5)
+    height = max(int(width * 11 / 8.5), 2 * margin + line_height * len(lines))
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((margin, margin + i * line_height), line, fill=0, font=font)
+    image.save(path)
+    return path
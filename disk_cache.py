@@ -0,0 +1,128 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+# Content-addressed on-disk cache with size-based LRU eviction. Entries are
+# plain files named by key; a hit refreshes the file's mtime, so the oldest
+# mtimes are evicted first once the directory grows past max_bytes.
+
+CACHE_ROOT = os.environ.get("RESUME_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "resume-enhancer"))
+
+
+def hash_bytes(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_file(file_path, *extra):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return hash_bytes(digest.hexdigest(), *extra)
+
+
+class DiskCache:
+    def __init__(self, name, max_bytes, root=None, suffix=""):
+        self.directory = os.path.join(root or CACHE_ROOT, name)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def _entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.endswith(".tmp") or not name.endswith(self.suffix):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, name in self._entries():
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self._scan_size(),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,130 @@
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+# One streaming pass over a DOCX's main document XML, collecting everything the
+# scoring modules need: body paragraphs, tables, inline images and fonts.
+# Only the document part is decompressed (never word/media), and each body
+# element is dropped as soon as it has been read. The text rules follow
+# python-docx (Document.paragraphs, tables, inline_shapes and run.font.name),
+# so results match the python-docx based code this replaces.
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WP = "{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}"
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+PKG_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+RUN_TEXT = {W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+
+def _document_part(archive):
+    # The main part is named in _rels/.rels; it is almost always word/document.xml
+    try:
+        rels = ET.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(PKG_RELS):
+        if rel.get("Type") == OFFICE_DOCUMENT:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def _run_text(run):
+    parts = []
+    for child in run:
+        if child.tag == W + "t":
+            parts.append(child.text or "")
+        elif child.tag == W + "br":
+            parts.append("\n" if child.get(W + "type", "textWrapping") == "textWrapping" else "")
+        else:
+            parts.append(RUN_TEXT.get(child.tag, ""))
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph):
+    parts = []
+    for child in paragraph:
+        if child.tag == W + "r":
+            parts.append(_run_text(child))
+        elif child.tag == W + "hyperlink":
+            parts.extend(_run_text(run) for run in child.iterfind(W + "r"))
+    return "".join(parts)
+
+
+def _run_fonts(paragraph):
+    for run in paragraph.iterfind(W + "r"):
+        fonts = run.find(f"{W}rPr/{W}rFonts")
+        if fonts is not None and fonts.get(W + "ascii"):
+            yield fonts.get(W + "ascii")
+
+
+def _table_rows(table):
+    # Cell text as python-docx's cell.text: the cell's paragraphs joined by newlines
+    return [["\n".join(_paragraph_text(p) for p in cell.iterfind(W + "p")) for cell in row.iterfind(W + "tc")]
+            for row in table.iterfind(W + "tr")]
+
+
+def _inline_images(element):
+    # Same match as python-docx's inline_shapes: //w:p/w:r/w:drawing/wp:inline
+    return sum(1 for p in element.iter(W + "p") for _ in p.iterfind(f"{W}r/{W}drawing/{WP}inline"))
+
+
+def iter_docx(file_path):
+    """
+    Stream the body of a DOCX file.
+    Yields:
+        tuple: ("paragraph", text), ("table", rows of cell texts), ("images", count)
+        or ("font", name) for each run with an explicit font, in document order.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(_document_part(archive)) as part:
+            depth = 0
+            body = None
+            for event, element in ET.iterparse(part, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and element.tag == W + "body":
+                        body = element
+                    continue
+                depth -= 1
+                if depth != 2 or body is None:
+                    continue
+                # A direct child of w:body is complete
+                if element.tag == W + "p":
+                    yield "paragraph", _paragraph_text(element)
+                    for font in _run_fonts(element):
+                        yield "font", font
+                elif element.tag == W + "tbl":
+                    yield "table", _table_rows(element)
+                images = _inline_images(element)
+                if images:
+                    yield "images", images
+                body.clear()
+
+
+@lru_cache(maxsize=32)
+def _read_docx(file_path, mtime, size):
+    content = {"paragraphs": [], "tables": [], "images": 0, "fonts": set()}
+    for kind, value in iter_docx(file_path):
+        if kind == "paragraph":
+            content["paragraphs"].append(value)
+        elif kind == "table":
+            content["tables"].append(value)
+        elif kind == "images":
+            content["images"] += value
+        else:
+            content["fonts"].add(value)
+    return content
+
+
+def read_docx(file_path):
+    """
+    Read a DOCX file once; repeat calls for an unchanged file reuse the result
+    (so treat it as read-only).
+    Returns:
+        dict: {"paragraphs": list of str, "tables": list of rows, "images": int, "fonts": set of str}
+    """
+    stat = os.stat(file_path)
+    return _read_docx(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
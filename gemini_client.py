@@ -0,0 +1,194 @@
+import asyncio
+import os
+import threading
+import time
+import google.generativeai as genai
+from llm_cache import response_cache
+from tracing import record_span, stage
+
+# Shared Gemini access for every module: the API is configured once per key,
+# model handles are reused, and one process-wide limit caps how many requests
+# are in flight at once, counting blocking, streaming and async calls together.
+# Responses are stored in llm_cache, so a repeated prompt skips the round trip.
+
+DEFAULT_MODEL = "gemini-2.5-pro"
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+
+_models = {}
+_configured_key = None
+_lock = threading.Lock()
+_limit = MAX_CONCURRENT_REQUESTS
+_slots = threading.BoundedSemaphore(_limit)
+# How often a waiting coroutine retries for a free slot
+ASYNC_POLL_SECONDS = 0.05
+# Optional replacement backend: callable(model_name) -> object with
+# generate_content()/generate_content_async(), e.g. gemini_stub.StubModel
+_model_factory = None
+
+
+class GeminiError(RuntimeError):
+    """Raised by generate_text(), generate_text_async() and stream_text() when the Gemini request itself fails."""
+
+
+def set_concurrency_limit(limit):
+    """Cap the number of Gemini requests in flight; applies to calls started afterwards."""
+    global _limit, _slots
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1.")
+    with _lock:
+        _limit = limit
+        _slots = threading.BoundedSemaphore(limit)
+
+
+def set_model_factory(factory):
+    """
+    Swap the Gemini backend, e.g. for a local stub; None restores Gemini.
+    Responses from a swapped backend bypass the response cache.
+    """
+    global _model_factory
+    with _lock:
+        _model_factory = factory
+        _models.clear()
+
+
+def _use_cache(use_cache):
+    return use_cache and _model_factory is None
+
+
+def get_model(gemini_api_key, model_name=DEFAULT_MODEL):
+    """
+    Return a cached GenerativeModel, configuring the API only when the key changes.
+    The key is global to the genai module, so a process should use one key:
+    switching it also switches calls already in flight.
+    """
+    global _configured_key
+    if _model_factory is not None:
+        return _model_factory(model_name)
+    with _lock:
+        if gemini_api_key != _configured_key:
+            genai.configure(api_key=gemini_api_key)
+            _configured_key = gemini_api_key
+            _models.clear()
+        model = _models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            _models[model_name] = model
+        return model
+
+
+async def _acquire_async(slots):
+    # Same semaphore as the blocking calls, without blocking the event loop;
+    # polling keeps cancellation safe (nothing is acquired on our behalf later)
+    while not slots.acquire(blocking=False):
+        await asyncio.sleep(ASYNC_POLL_SECONDS)
+
+
+def generate_text(prompt, gemini_api_key, model_name=DEFAULT_MODEL, use_cache=True):
+    """
+    Send a prompt to Gemini and return the response text (not stripped).
+    Args:
+        use_cache (bool): Set to False to bypass the response cache for this call.
+    """
+    use_cache = _use_cache(use_cache)
+    with stage("gemini", model=model_name, prompt_chars=len(prompt)) as attrs:
+        if use_cache:
+            cached = response_cache.get(model_name, prompt)
+            if cached is not None:
+                attrs.update(cached=True, response_chars=len(cached))
+                return cached
+        model = get_model(gemini_api_key, model_name)
+        try:
+            with _slots:
+                text = model.generate_content(prompt).text
+        except Exception as e:
+            raise GeminiError(f"Gemini request failed: {e}") from e
+        attrs.update(cached=False, response_chars=len(text))
+        if use_cache:
+            response_cache.put(model_name, prompt, text)
+        return text
+
+
+async def generate_text_async(prompt, gemini_api_key, model_name=DEFAULT_MODEL, use_cache=True):
+    """Async generate_text(); waits for a free slot under the concurrency limit."""
+    # The traced CPU time also counts other coroutines run during the await
+    use_cache = _use_cache(use_cache)
+    with stage("gemini", model=model_name, prompt_chars=len(prompt)) as attrs:
+        if use_cache:
+            cached = response_cache.get(model_name, prompt)
+            if cached is not None:
+                attrs.update(cached=True, response_chars=len(cached))
+                return cached
+        model = get_model(gemini_api_key, model_name)
+        slots = _slots
+        await _acquire_async(slots)
+        try:
+            text = (await model.generate_content_async(prompt)).text
+        except Exception as e:
+            raise GeminiError(f"Gemini request failed: {e}") from e
+        finally:
+            slots.release()
+        attrs.update(cached=False, response_chars=len(text))
+        if use_cache:
+            response_cache.put(model_name, prompt, text)
+        return text
+
+
+def stream_text(prompt, gemini_api_key, model_name=DEFAULT_MODEL, use_cache=True, stats=None):
+    """
+    Yield the response text chunk by chunk as Gemini produces it. Close the
+    generator if you stop reading early, so its concurrency slot is freed.
+    Args:
+        stats (dict): Optional; filled with "ttft" (seconds to the first
+            chunk), "total" (seconds until the last chunk), "chars" and "cached".
+    """
+    stats = stats if stats is not None else {}
+    start = time.perf_counter()
+    stats.update(ttft=None, total=None, chars=0, cached=False)
+    use_cache = _use_cache(use_cache)
+    if use_cache:
+        cached = response_cache.get(model_name, prompt)
+        if cached is not None:
+            stats.update(ttft=time.perf_counter() - start, total=time.perf_counter() - start,
+                         chars=len(cached), cached=True)
+            record_span("gemini_stream", start, stats["total"], model=model_name, prompt_chars=len(prompt),
+                        response_chars=len(cached), cached=True)
+            yield cached
+            return
+    model = get_model(gemini_api_key, model_name)
+    parts = []
+    slots = _slots
+    slots.acquire()
+    # The slot is held across yields: released when the stream ends, fails or
+    # is closed early (callers should close() it, e.g. with contextlib.closing)
+    try:
+        try:
+            stream = iter(model.generate_content(prompt, stream=True))
+        except Exception as e:
+            raise GeminiError(f"Gemini request failed: {e}") from e
+        while True:
+            # Failures can come mid-stream too; the yield stays outside this try
+            try:
+                text = next(stream).text
+            except StopIteration:
+                break
+            except Exception as e:
+                raise GeminiError(f"Gemini request failed: {e}") from e
+            if not text:
+                continue
+            if stats["ttft"] is None:
+                stats["ttft"] = time.perf_counter() - start
+            parts.append(text)
+            stats["chars"] += len(text)
+            yield text
+    finally:
+        slots.release()
+    stats["total"] = time.perf_counter() - start
+    # A generator can't hold a stage open across yields, so the span is added afterwards
+    record_span("gemini_stream", start, stats["total"], model=model_name, prompt_chars=len(prompt),
+                response_chars=stats["chars"], cached=False, ttft=stats["ttft"])
+    if use_cache:
+        response_cache.put(model_name, prompt, "".join(parts))
+
+
+def cache_stats():
+    return response_cache.stats()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import re
+import time
+
+# Offline stand-in for a Gemini model, for the local server, benchmarks and
+# tests: gemini_client.set_model_factory(StubModel). Responses are canned per
+# prompt type (recognised by the prompt builders' wording) and deterministic,
+# so each workflow can run end to end without a key or network access.
+
+STUB_LATENCY = float(os.environ.get("GEMINI_STUB_LATENCY", "0"))
+CHUNK_CHARS = 200
+
+ATS_FEEDBACK = """1. ATS Score: 72
+2. Strengths: Relevant Experience, Technical Skills
+3. Weaknesses: Few Quantified Results
+4. Suggestions: Add Metrics, Mirror Job Keywords
+5. Missing or Mismatched Skills/Keywords: Cloud Deployment"""
+GAP_QUESTIONS = """1. Have you deployed a project to a cloud platform?
+2. Have you led or mentored a team?
+3. Do you have a project with measurable impact?"""
+EXAMPLE_ITEM = "Built and deployed a data dashboard used by 50+ people, cutting weekly reporting time by 30%."
+LATEX_DOCUMENT = "\\documentclass{article}\n\\begin{document}\n%s\n\\end{document}\n"
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+def _section(prompt, name):
+    # Text between "NAME:" and the next all-caps heading, or the end
+    match = re.search(rf"^{name}:\n(.*?)(?=^\n?[A-Z][A-Z /]+:\n|\Z)", prompt, re.DOTALL | re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
+def stub_response(prompt):
+    """The canned reply for a prompt built by this project's workflows."""
+    if "You are an ATS (Applicant Tracking System) expert" in prompt:
+        return ATS_FEEDBACK
+    if "list the top 3-5 most important missing" in prompt:
+        return GAP_QUESTIONS
+    if "Rewrite the following user-provided detail" in prompt:
+        detail = re.search(r"User detail: (.*)", prompt)
+        return f"Delivered {detail.group(1).strip() if detail else 'the project'} end to end."
+    if "Generate a strong, relevant project" in prompt:
+        return EXAMPLE_ITEM
+    if "You are a LaTeX expert" in prompt:
+        return LATEX_DOCUMENT % _section(prompt, "RESUME DATA").replace("\n", "\n\n")
+    if "NEW ITEMS TO ADD" in prompt:
+        return _section(prompt, "RESUME") + "\n--- NEW ITEMS ---\n" + _section(prompt, "NEW ITEMS TO ADD")
+    if "suggest improvements and rewrite the resume" in prompt:
+        return "1. Add metrics to each role.\n\n" + _section(prompt, "RESUME")
+    return "OK"
+
+
+class StubModel:
+    """Minimal GenerativeModel look-alike: generate_content() (optionally streamed) and its async version."""
+
+    def __init__(self, model_name="stub", latency=STUB_LATENCY):
+        self.model_name = model_name
+        self.latency = latency
+
+    def generate_content(self, prompt, stream=False):
+        if self.latency:
+            time.sleep(self.latency)
+        text = stub_response(prompt)
+        if stream:
+            return iter([_Response(text[i:i + CHUNK_CHARS]) for i in range(0, len(text), CHUNK_CHARS)])
+        return _Response(text)
+
+    async def generate_content_async(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return _Response(stub_response(prompt))
@@ -0,0 +1,527 @@
+import argparse
+import asyncio
+import glob
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter
+import numpy as np
+from disk_cache import CACHE_ROOT, hash_bytes
+from tracing import stage
+
+# Fast local job-match score: TF-IDF term vectors for the job description and
+# for each resume section (from split_sections), with sections weighted by how
+# much a keyword there is worth. The score is the weighted share of the job's
+# keywords the resume covers; bigrams only add to the cosine similarity, since
+# job-ad phrasing rarely reappears word for word. Clearly strong or clearly weak matches can be
+# decided without Gemini; only the ambiguous middle band needs the full
+# get_ats_score_from_gemini() call. Each decision is appended to a JSONL log
+# (with the Gemini score when there is one) so the cut-offs can be calibrated:
+# python job_match.py --calibrate
+
+# A job keyword found in a section earns this share of its weight
+SECTION_WEIGHTS = {
+    "Skills": 1.0,
+    "Work Experience": 1.0,
+    "Projects": 0.8,
+    "Professional Summary": 0.6,
+    "Certifications": 0.6,
+    "Publications": 0.5,
+    "Awards & Achievements": 0.4,
+    "Education": 0.4,
+    "Volunteer Experience": 0.4,
+    "Extracurricular Activities": 0.3,
+    "Languages": 0.3,
+    "Contact Information": 0.0,
+}
+DEFAULT_SECTION_WEIGHT = 0.5  # "Other" (text before the first header) and anything unmapped
+SECTION_ORDER = {name: i for i, name in enumerate(SECTION_WEIGHTS)}
+
+# Local score (0-100) cut-offs; scores in between go to Gemini
+STRONG_MATCH = float(os.environ.get("JOB_MATCH_STRONG", "60"))
+WEAK_MATCH = float(os.environ.get("JOB_MATCH_WEAK", "25"))
+LOG_PATH = os.environ.get("JOB_MATCH_LOG", os.path.join(CACHE_ROOT, "job_match.jsonl"))
+# Always ask Gemini too (and log both scores), whatever the local band
+CALIBRATE = os.environ.get("JOB_MATCH_CALIBRATE", "off").lower() not in ("", "0", "off", "false")
+TOP_TERMS = 10
+
+TOKEN = re.compile(r"[a-z][a-z0-9]*(?:[+#]+|(?:[.\-/][a-z0-9]+)+)?")
+STOP_WORDS = frozenset("""
+a about above across after again against all also an and any are as at be been being both but by can could
+did do does doing during each etc every for from further had has have having he her here hers him his how i
+if in into is it its itself just least less like may me more most must my no nor not of off on once only or
+other our ours out over own per plus same she should so some such than that the their them then there these
+they this those through to too under until up upon us very via was we well were what when where which while
+who whom why will with within without would you your yours
+ability able apply candidate candidates company experience experienced familiarity good great ideal
+including join job knowledge looking need needs new opportunity position preferred required requirements
+responsibilities role seeking skills strong team understanding using work working year years
+""".split())
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN.findall(text.lower()):
+        token = token.rstrip(".-/")
+        if (len(token) > 1 and token not in STOP_WORDS) or token in ("c", "r"):
+            tokens.append(token)
+    return tokens
+
+
+def term_counts(text):
+    """Unigram and adjacent-bigram counts for a piece of text."""
+    counts = Counter()
+    for line in text.splitlines():
+        tokens = tokenize(line)
+        counts.update(tokens)
+        counts.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return counts
+
+
+def build_idf(documents):
+    """Smoothed inverse document frequency over a list of term-count dicts (or term sets)."""
+    df = Counter()
+    for terms in documents:
+        df.update(set(terms))
+    n = len(documents)
+    return {term: math.log((1 + n) / (1 + count)) + 1.0 for term, count in df.items()}
+
+
+def tfidf(counts, idf):
+    # Sublinear term frequency: a keyword repeated ten times isn't ten times as relevant
+    return {term: (1.0 + math.log(count)) * idf.get(term, 1.0) for term, count in counts.items()}
+
+
+def section_weight(section):
+    return SECTION_WEIGHTS.get(section, DEFAULT_SECTION_WEIGHT)
+
+
+def band_for(score, strong=STRONG_MATCH, weak=WEAK_MATCH):
+    if score >= strong:
+        return "strong"
+    if score <= weak:
+        return "weak"
+    return "ambiguous"
+
+
+def section_counts(sections):
+    """term_counts() per non-empty section: the vectorised form of a resume, reusable across jobs."""
+    return {name: term_counts(text) for name, text in sections.items() if text}
+
+
+def _match_matrix(resumes, job_counts, idf):
+    """
+    Score many resumes against one job with array operations.
+    Args:
+        resumes (list of dict): section_counts() of each resume.
+        job_counts (Counter): term_counts() of the job description.
+        idf (dict): Term weights from build_idf().
+    Returns:
+        dict of numpy arrays: "scores" (R,), "similarity" (R,), "contributions"
+        (R, sections), "found" (R, keywords), plus the "sections" and "keywords"
+        labels (keywords heaviest first).
+    """
+    job_vector = tfidf(job_counts, idf)
+    terms = list(job_vector)
+    term_index = {term: i for i, term in enumerate(terms)}
+    keywords = [term for term in terms if " " not in term]
+    keyword_index = {term: i for i, term in enumerate(keywords)}
+    # Listed sections first, so ties credit e.g. the Summary before Certifications
+    names = sorted({name for counts in resumes for name in counts},
+                   key=lambda name: (SECTION_ORDER.get(name, len(SECTION_ORDER)), name))
+    name_index = {name: i for i, name in enumerate(names)}
+    weights = np.array([section_weight(name) for name in names], dtype=float)
+
+    # One (resume, section, term, count) entry per distinct term of each section;
+    # the job's terms take the first vocabulary ids
+    vocabulary = dict(term_index)
+    rows, sections_of, columns, counts = [], [], [], []
+    for r, counts_by_section in enumerate(resumes):
+        for name, section in counts_by_section.items():
+            s = name_index[name]
+            for term, count in section.items():
+                rows.append(r)
+                sections_of.append(s)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+    rows = np.array(rows, dtype=np.int64)
+    sections_of = np.array(sections_of, dtype=np.int64)
+    columns = np.array(columns, dtype=np.int64)
+    idf_values = np.array([idf.get(term, 1.0) for term in vocabulary])
+    values = (1.0 + np.log(np.array(counts, dtype=float))) * idf_values[columns] * weights[sections_of]
+
+    # Sum the sections into one vector per resume: norms over every term,
+    # dense columns only for the job's terms
+    size = len(vocabulary)
+    cells, inverse = np.unique(rows * size + columns, return_inverse=True)
+    summed = np.bincount(inverse, weights=values, minlength=len(cells))
+    norms = np.sqrt(np.bincount(cells // size, weights=summed ** 2, minlength=len(resumes)))
+    vectors = np.zeros((len(resumes), len(terms)))
+    on_job = cells % size < len(terms)
+    vectors[cells[on_job] // size, cells[on_job] % size] = summed[on_job]
+
+    # presence[r, s, k]: keyword k appears in section s of resume r
+    keyword_of = np.full(size, -1)
+    keyword_of[[term_index[term] for term in keywords]] = np.arange(len(keywords))
+    entry_keyword = keyword_of[columns]
+    hits = entry_keyword >= 0
+    presence = np.zeros((len(resumes), len(names), len(keywords)), dtype=bool)
+    presence[rows[hits], sections_of[hits], entry_keyword[hits]] = True
+
+    job = np.array([job_vector[term] for term in terms])
+    keyword_weights = np.array([job_vector[term] for term in keywords])
+    total = keyword_weights.sum()
+    # Each keyword is credited once, by the best-weighted section that has it
+    weighted = presence * weights[None, :, None]
+    best = weighted.max(axis=1, initial=0.0)
+    credit = best * keyword_weights
+    contributions = np.zeros((len(resumes), len(names)))
+    if names:
+        owner = weighted.argmax(axis=1)
+        np.add.at(contributions, (np.arange(len(resumes))[:, None], owner), credit)
+    denominator = norms * np.linalg.norm(job)
+    similarity = np.divide(vectors @ job, denominator, out=np.zeros(len(resumes)), where=denominator > 0)
+    # Keyword columns reordered by job weight, heaviest first
+    order = np.argsort(-keyword_weights, kind="stable")
+    return {
+        "scores": 100.0 * credit.sum(axis=1) / total if total else np.zeros(len(resumes)),
+        "similarity": similarity,
+        "contributions": 100.0 * contributions / total if total else contributions,
+        "found": (best > 0)[:, order],
+        "sections": names,
+        "keywords": [keywords[k] for k in order],
+    }
+
+
+def _match_row(matrix, r, strong=STRONG_MATCH, weak=WEAK_MATCH, keywords=None):
+    # keywords: row r's own labels when they differ per row (_jobs_matrix)
+    score = round(float(matrix["scores"][r]), 1)
+    contributions = matrix["contributions"][r]
+    found = matrix["found"][r]
+    keywords = matrix["keywords"] if keywords is None else keywords
+    return {
+        "score": score,
+        "similarity": round(float(matrix["similarity"][r]), 4),
+        "band": band_for(score, strong, weak),
+        "sections": {matrix["sections"][s]: round(float(contributions[s]), 1)
+                     for s in np.argsort(-contributions, kind="stable") if contributions[s] > 0},
+        "matched": [term for term, hit in zip(keywords, found) if hit][:TOP_TERMS],
+        "missing": [term for term, hit in zip(keywords, found) if not hit][:TOP_TERMS],
+    }
+
+
+def score_job_match(sections, job_description, strong=STRONG_MATCH, weak=WEAK_MATCH):
+    """
+    Score how well resume sections cover a job description, locally.
+    Args:
+        sections (dict): {canonical section: text}, e.g. split_sections() output.
+        job_description (str): The job description text.
+    Returns:
+        dict: {
+            "score": float (0-100, weighted share of the job's keywords found),
+            "similarity": float (cosine of the TF-IDF vectors),
+            "band": "strong" | "weak" | "ambiguous",
+            "sections": {section: share of the score},
+            "matched": list of str, "missing": list of str (top job keywords)
+        }
+    """
+    counts = section_counts(sections)
+    job_counts = term_counts(job_description)
+    # Each resume section and the job description count as one document
+    idf = build_idf(list(counts.values()) + [job_counts])
+    return _match_row(_match_matrix([counts], job_counts, idf), 0, strong, weak)
+
+
+def rank_resumes(resumes, job_description, top_k=None, strong=STRONG_MATCH, weak=WEAK_MATCH):
+    """
+    Rank many resumes against one job description in a single batch.
+    Args:
+        resumes (list): File paths, ParsedResume objects or {section: text} dicts.
+        job_description (str): The job description text.
+        top_k (int): Return only the best top_k (default: all).
+    Returns:
+        list of dict: score_job_match() output plus "rank" and "index" (position
+        in resumes), best first. The IDF is fitted on the whole pool, so keywords
+        every candidate has count for less than the ones that set candidates apart.
+    """
+    from ats_job_des import parse_resume
+    with stage("rank_resumes", resumes=len(resumes)):
+        counts = []
+        for resume in resumes:
+            sections = resume if isinstance(resume, dict) else parse_resume(resume).sections
+            counts.append(section_counts(sections))
+        job_counts = term_counts(job_description)
+        # One document per resume (all its sections) plus the job
+        idf = build_idf([set().union(*by_section.values()) for by_section in counts] + [job_counts])
+        matrix = _match_matrix(counts, job_counts, idf)
+        order = np.lexsort((-matrix["similarity"], -matrix["scores"]))
+        ranked = []
+        for rank, r in enumerate(order[:top_k] if top_k else order, 1):
+            ranked.append(dict(_match_row(matrix, r, strong, weak), rank=rank, index=int(r)))
+        return ranked
+
+
+def _jobs_matrix(resume_counts, jobs, idf):
+    """
+    Score one resume against many jobs with array operations (the transpose of
+    _match_matrix(): the resume side is built once, the jobs are the batch).
+    Args:
+        resume_counts (dict): section_counts() of the resume.
+        jobs (list of Counter): term_counts() of each job description.
+        idf (dict): Term weights from build_idf().
+    Returns:
+        dict: numpy "scores" (J,), "similarity" (J,), "contributions" (J, sections),
+        the "sections" labels and per job the "keywords" (heaviest first) and "found" flags.
+    """
+    names = sorted(resume_counts, key=lambda name: (SECTION_ORDER.get(name, len(SECTION_ORDER)), name))
+    weights = np.array([section_weight(name) for name in names], dtype=float)
+
+    # The resume, once: its section-weighted TF-IDF vector, and per term the
+    # best section weight it earns as a keyword and which section that is
+    vocabulary = {}
+    resume_vector = Counter()
+    best_weight, owner = {}, {}
+    for s, name in enumerate(names):
+        for term, value in tfidf(resume_counts[name], idf).items():
+            vocabulary.setdefault(term, len(vocabulary))
+            resume_vector[term] += weights[s] * value
+            if weights[s] > best_weight.get(term, 0.0):
+                best_weight[term], owner[term] = weights[s], s
+    resume_norm = math.sqrt(sum(v * v for v in resume_vector.values()))
+
+    # One (job, term, count) entry per distinct term of each job
+    rows, columns, counts = [], [], []
+    for j, job_counts in enumerate(jobs):
+        for term, count in job_counts.items():
+            rows.append(j)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+    rows = np.array(rows, dtype=np.int64)
+    columns = np.array(columns, dtype=np.int64)
+    terms = list(vocabulary)
+    values = (1.0 + np.log(np.array(counts, dtype=float))) * np.array([idf.get(t, 1.0) for t in terms])[columns]
+
+    on_resume = np.zeros(len(terms))
+    term_weight = np.zeros(len(terms))
+    term_owner = np.zeros(len(terms), dtype=np.int64)
+    for term, value in resume_vector.items():
+        t = vocabulary[term]
+        on_resume[t] = value
+        term_weight[t] = best_weight.get(term, 0.0)
+        term_owner[t] = owner.get(term, 0)
+    is_keyword = np.array([" " not in term for term in terms])[columns]
+
+    keyword_values = values * is_keyword
+    credit = keyword_values * term_weight[columns]
+    totals = np.bincount(rows, weights=keyword_values, minlength=len(jobs))
+    covered = np.bincount(rows, weights=credit, minlength=len(jobs))
+    contributions = np.bincount(rows * len(names) + term_owner[columns], weights=credit,
+                                minlength=len(jobs) * len(names)).reshape(len(jobs), len(names)) if names else \
+        np.zeros((len(jobs), 0))
+    job_norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=len(jobs)))
+    dots = np.bincount(rows, weights=values * on_resume[columns], minlength=len(jobs))
+    denominator = job_norms * resume_norm
+    safe_totals = np.where(totals > 0, totals, 1.0)
+
+    # Per job keyword lists, heaviest first
+    keywords = [[] for _ in jobs]
+    found = [[] for _ in jobs]
+    for i in np.lexsort((-keyword_values, rows)):
+        if is_keyword[i]:
+            keywords[rows[i]].append(terms[columns[i]])
+            found[rows[i]].append(credit[i] > 0)
+    return {
+        "scores": np.where(totals > 0, 100.0 * covered / safe_totals, 0.0),
+        "similarity": np.divide(dots, denominator, out=np.zeros(len(jobs)), where=denominator > 0),
+        "contributions": 100.0 * contributions / safe_totals[:, None],
+        "sections": names,
+        "keywords": keywords,
+        "found": found,
+    }
+
+
+def match_jobs(resume, job_descriptions, top_k=None, gemini_api_key=None, feedback_top=3,
+               strong=STRONG_MATCH, weak=WEAK_MATCH):
+    """
+    Rank many job descriptions for one resume; the resume is extracted, split
+    and vectorised once, and every job is scored locally in one batch.
+    Args:
+        resume: File path, ParsedResume or {section: text} dict.
+        job_descriptions (list of str): The jobs to compare.
+        top_k (int): Return only the best top_k (default: all).
+        gemini_api_key (str): If given, the best feedback_top jobs also get
+            Gemini ATS feedback, requested concurrently.
+    Returns:
+        list of dict: score_job_match() output plus "rank" and "index" (position
+        in job_descriptions), best first; Gemini rows add "gemini_score" and
+        "feedback" (or "error"). The IDF is fitted on the jobs plus the resume,
+        so requirements every job shares count for less than distinctive ones.
+    """
+    from ats_job_des import ParsedResume, parse_resume
+    with stage("match_jobs", jobs=len(job_descriptions)):
+        if isinstance(resume, dict):
+            resume = ParsedResume("\n\n".join(resume.values()), resume)
+        else:
+            resume = parse_resume(resume)
+        counts = section_counts(resume.sections)
+        jobs = [term_counts(job_description) for job_description in job_descriptions]
+        idf = build_idf(jobs + [set().union(*counts.values())])
+        matrix = _jobs_matrix(counts, jobs, idf)
+        order = np.lexsort((-matrix["similarity"], -matrix["scores"]))
+        ranked = []
+        for rank, j in enumerate(order[:top_k] if top_k else order, 1):
+            row = _match_row(matrix, j, strong, weak, keywords=matrix["keywords"][j])
+            ranked.append(dict(row, rank=rank, index=int(j)))
+    if gemini_api_key and feedback_top:
+        shortlist = ranked[:feedback_top]
+        feedback = gemini_feedback([(resume, job_descriptions[row["index"]]) for row in shortlist], gemini_api_key)
+        for row, extra in zip(shortlist, feedback):
+            row.update(extra)
+    return ranked
+
+
+async def _gemini_feedback(pairs, gemini_api_key):
+    from ats_job_des import get_ats_score_from_gemini_async
+    return await asyncio.gather(*(get_ats_score_from_gemini_async(resume, job_description, gemini_api_key)
+                                  for resume, job_description in pairs), return_exceptions=True)
+
+
+def gemini_feedback(pairs, gemini_api_key):
+    """
+    Gemini ATS feedback for several (resume, job description) pairs at once;
+    gemini_client's concurrency limit still applies.
+    Returns:
+        list of dict: {"gemini_score": int, "feedback": str} or {"error": str}, in pair order.
+    """
+    from ats_job_des import parse_ats_score
+    results = []
+    for feedback in asyncio.run(_gemini_feedback(pairs, gemini_api_key)):
+        if isinstance(feedback, Exception):
+            results.append({"error": str(feedback)})
+        else:
+            results.append({"gemini_score": parse_ats_score(feedback), "feedback": feedback})
+    return results
+
+
+def log_match(match, job_description, gemini_score=None, resume_path=None, path=LOG_PATH):
+    """Append one local/Gemini score pair to the calibration log (JOB_MATCH_LOG=off disables it)."""
+    if not path or path.lower() == "off":
+        return
+    record = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resume": os.path.basename(resume_path) if resume_path else None,
+        "job": hash_bytes(job_description)[:16],
+        "local_score": match["score"],
+        "similarity": match["similarity"],
+        "band": match["band"],
+        "gemini_score": gemini_score,
+    }
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Could not write the job match log: {e}")
+
+
+def calibration_report(path=LOG_PATH, bucket=10):
+    """Print the mean Gemini score per local-score bucket from the log."""
+    buckets = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("gemini_score") is None:
+                continue
+            key = int(record["local_score"] // bucket) * bucket
+            buckets.setdefault(key, []).append(record["gemini_score"])
+    if not buckets:
+        print("No entries with a Gemini score yet (set JOB_MATCH_CALIBRATE=on to collect them).")
+        return
+    print(f"{'local score':<12} {'n':>4} {'gemini mean':>12} {'>=70':>6} {'<=60':>6}")
+    for key in sorted(buckets):
+        scores = buckets[key]
+        print(f"{key:>3}-{key + bucket - 1:<8} {len(scores):>4} {sum(scores) / len(scores):12.1f} "
+              f"{sum(s >= 70 for s in scores):>6} {sum(s <= 60 for s in scores):>6}")
+    print(f"Current cut-offs: weak <= {WEAK_MATCH:g}, strong >= {STRONG_MATCH:g}")
+
+
+def find_jobs(path_or_glob):
+    """Return the job description (.txt) files in a directory, or matching a glob pattern."""
+    pattern = os.path.join(path_or_glob, "*.txt") if os.path.isdir(path_or_glob) else path_or_glob
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def _print_job_matches(args):
+    paths = find_jobs(args.job_description)
+    if not paths:
+        print(f"No job descriptions found for {args.job_description}", file=sys.stderr)
+        sys.exit(1)
+    job_descriptions = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            job_descriptions.append(f.read())
+    start = time.perf_counter()
+    ranked = match_jobs(args.resume, job_descriptions, top_k=args.top,
+                        gemini_api_key=os.environ.get("GEMINI_API_KEY") if args.gemini else None,
+                        feedback_top=args.top or 3)
+    print(f"Matched {len(paths)} jobs in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    for row in ranked:
+        row["job"] = paths[row.pop("index")]
+        print(json.dumps(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local job-match scores for resumes, or the calibration report.")
+    parser.add_argument("resume", nargs="?", help="Resume file, or with --rank a directory or glob of resumes")
+    parser.add_argument("job_description", nargs="?",
+                        help="File containing the job description, or with --jobs a directory or glob of them")
+    parser.add_argument("--rank", action="store_true", help="Rank every resume found against the job")
+    parser.add_argument("--jobs", action="store_true", help="Rank every job found (.txt files) for the resume")
+    parser.add_argument("--top", type=int, default=None, help="With --rank or --jobs: keep only the best N")
+    parser.add_argument("--gemini", action="store_true", help="With --rank or --jobs: Gemini feedback for the "
+                                                              "best matches (key from GEMINI_API_KEY)")
+    parser.add_argument("--calibrate", action="store_true", help="Summarise the logged local/Gemini score pairs")
+    args = parser.parse_args()
+    if args.calibrate:
+        calibration_report()
+        return
+    if not args.resume or not args.job_description:
+        parser.error("resume and job_description are required")
+    from ats_job_des import parse_resume
+    if args.jobs:
+        _print_job_matches(args)
+        return
+    with open(args.job_description, encoding="utf-8") as f:
+        job_description = f.read()
+    if not args.rank:
+        print(json.dumps(score_job_match(parse_resume(args.resume).sections, job_description), indent=2))
+        return
+
+    from ats_batch import find_resumes
+    paths = find_resumes(args.resume)
+    if not paths:
+        print(f"No resumes found for {args.resume}", file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    resumes = [parse_resume(path) for path in paths]
+    parsed = time.perf_counter()
+    ranked = rank_resumes(resumes, job_description, top_k=args.top)
+    print(f"Parsed {len(paths)} resumes in {parsed - start:.2f}s, ranked in {time.perf_counter() - parsed:.3f}s",
+          file=sys.stderr)
+    if args.gemini:
+        # Only the shortlist pays for a Gemini call (the best 3 unless --top is given)
+        shortlist = ranked[:args.top or 3]
+        feedback = gemini_feedback([(resumes[row["index"]], job_description) for row in shortlist],
+                                   os.environ.get("GEMINI_API_KEY"))
+        for row, extra in zip(shortlist, feedback):
+            row.update(extra)
+    for row in ranked:
+        row["file"] = paths[row.pop("index")]
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
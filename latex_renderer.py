@@ -0,0 +1,439 @@
+import re
+from ats_job_des import match_section
+from gemini_client import generate_text
+from latex_to_pdf import split_preamble
+
+# Local, deterministic rendering of sectioned resume text ("--- SECTION ---"
+# blocks, as produced by format_resume_for_gemini and returned by the improve
+# and rebuild prompts) onto the macros of latex_template. Only sections it
+# cannot map are sent to Gemini. Every input line is checked against the
+# rendered body afterwards, so callers can fall back to Gemini for the whole
+# document when something could not be placed.
+
+# Macros the rendered body relies on; templates without them go to Gemini.
+REQUIRED_MACROS = ("\\resumeSubheading", "\\resumeItem", "\\resumeSubHeadingListStart", "\\resumeItemListStart")
+
+SECTION_MARKER = re.compile(r"^\s*-{3,}\s*(.+?)\s*-{3,}\s*$", re.MULTILINE)
+BULLET_PREFIX = re.compile(r"^\s*(?:[\-\*\u2022\u25cf\u25aa]|\d{1,2}[.)])\s+")
+MONTH = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+)?(?:19|20)\d{{2}}|(?:0?[1-9]|1[0-2])/(?:19|20)\d{{2}}"
+DATE_RANGE = re.compile(rf"\(?((?:{DATE})(?:\s*(?:-|–|—|to)\s*(?:{DATE}|Present|Current|Now|Ongoing))?)\)?\s*$",
+                        re.IGNORECASE)
+EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Candidates only: _is_phone() also asks for 7+ digits that aren't just years
+PHONE = re.compile(r"(?<![\w+])\+?\(?\d[\d\s().-]{5,}\d(?!\w)")
+URL = re.compile(r"(?:https?://)?(?:www\.)?(?:[a-z0-9-]+\.)+[a-z]{2,}(?:/[^\s|,;{}\\]*)?", re.IGNORECASE)
+CONTACT_LABEL = re.compile(r"\b(?:email|e-mail|phone|mobile|linkedin|github|website|portfolio)\s*:", re.IGNORECASE)
+# A line holding only a place, e.g. "San Diego, California" or "Remote"
+LOCATION = re.compile(r"^(?:Remote|Hybrid|On-?site|[A-Z][\w.'-]*(?: [A-Z][\w.'-]*)*(?:,\s*[A-Z][\w.'-]*(?: [A-Z][\w.'-]*)*){1,2})$")
+# A wrapped bullet ends mid-phrase; the next line carries on from it
+OPEN_ENDING = re.compile(r"(?:[,;&/(-]|\b(?:and|or|with|of|to|for|the|in|on|at|by|a|an|using|via|including))$",
+                         re.IGNORECASE)
+HEADER_BLOCK = "Header"
+
+# Extra header spellings the Gemini prompts tend to produce.
+HEADER_ALIASES = {
+    "about": "Professional Summary",
+    "about section": "Professional Summary",
+    "relevant coursework": "Relevant Coursework",
+    "coursework": "Relevant Coursework",
+    "awards & achievements": "Awards & Achievements",
+    "achievements/certifications": "Awards & Achievements",
+    "personal details": "Contact Information",
+    "header": "Contact Information",
+    "other": "Other",
+}
+
+# How each canonical section is laid out with the template's macros.
+SECTION_STYLES = {
+    "Professional Summary": "paragraph",
+    "Skills": "labelled_list",
+    "Relevant Coursework": "columns",
+    "Work Experience": "entries",
+    "Education": "entries",
+    "Projects": "entries",
+    "Extracurricular Activities": "entries",
+    "Volunteer Experience": "entries",
+    "Certifications": "list",
+    "Awards & Achievements": "list",
+    "Languages": "labelled_list",
+    "Publications": "list",
+}
+SECTION_TITLES = {
+    "Skills": "Technical Skills",
+}
+
+_LATEX_SPECIALS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+}
+_LATEX_SPECIALS_RE = re.compile("|".join(re.escape(c) for c in _LATEX_SPECIALS))
+
+
+def escape_latex(text):
+    return _LATEX_SPECIALS_RE.sub(lambda m: _LATEX_SPECIALS[m.group()], text)
+
+
+def parse_sectioned_text(resume_text):
+    """
+    Return [(section title, content)] for each "--- SECTION ---" block. Text
+    before the first block (usually the name and contact lines) comes first,
+    titled HEADER_BLOCK. Text without any block gives [].
+    """
+    markers = list(SECTION_MARKER.finditer(resume_text))
+    blocks = []
+    leading = resume_text[:markers[0].start()].strip() if markers else ""
+    if leading:
+        blocks.append((HEADER_BLOCK, leading))
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(resume_text)
+        blocks.append((marker.group(1).strip(), resume_text[marker.end():end].strip()))
+    return blocks
+
+
+def canonical_section(title):
+    return HEADER_ALIASES.get(title.strip().lower()) or match_section(title)
+
+
+def _lines(content):
+    return [line.strip() for line in content.splitlines() if line.strip()]
+
+
+def _is_item(line):
+    return bool(BULLET_PREFIX.match(line))
+
+
+def _strip_item(line):
+    return BULLET_PREFIX.sub("", line, count=1).strip()
+
+
+def _tokens(text):
+    # Letters and digits only, so LaTeX escapes and reformatted dates still compare equal
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def unplaced_lines(resume_text, latex_body):
+    """Return the resume lines whose words don't all appear in the rendered LaTeX body."""
+    rendered = set(_tokens(latex_body))
+    unplaced = []
+    for line in _lines(resume_text):
+        if SECTION_MARKER.match(line):
+            continue
+        tokens = _tokens(CONTACT_LABEL.sub(" ", _strip_item(line)))
+        # Short words ("to" in "2019 to 2023") may be reformatted away
+        if not all(token in rendered for token in [t for t in tokens if len(t) > 2] or tokens):
+            unplaced.append(line)
+    return unplaced
+
+
+# --- HEADER ---
+def _url_label(url):
+    return re.sub(r"^(?:https?://)?(?:www\.)?", "", url).rstrip("/")
+
+
+def _url_icon(url):
+    lower = url.lower()
+    if "linkedin" in lower:
+        return "\\faLinkedin"
+    if "github" in lower:
+        return "\\faGithub"
+    return "\\faGlobe"
+
+
+def _escape_href(url):
+    # Characters hyperref would otherwise read as LaTeX inside \href{...}
+    return re.sub(r"([%#&])", r"\\\1", url)
+
+
+def _is_phone(candidate):
+    groups = re.findall(r"\d+", candidate)
+    if len("".join(groups)) < 7:
+        return False
+    # "2019 - 2023" style year runs are dates, not phone numbers
+    return not all(re.fullmatch(r"(?:19|20)\d\d", group) for group in groups)
+
+
+def _is_name(line):
+    if EMAIL.search(line) or URL.search(line) or re.search(r"[\d:,|@]", line):
+        return False
+    words = line.split()
+    return 1 <= len(words) <= 5 and all(word[:1].isupper() for word in words)
+
+
+def _is_contact_line(line):
+    # Numbered lines before the first block are Gemini's suggestions, not contact details
+    if _is_item(line):
+        return False
+    return (_is_name(line) or bool(EMAIL.search(line) or URL.search(line) or CONTACT_LABEL.search(line))
+            or any(_is_phone(candidate) for candidate in PHONE.findall(line)) or bool(LOCATION.match(line)))
+
+
+def render_header(content, icons=True):
+    lines = _lines(content)
+    if not lines:
+        return ""
+    # The name is the first line that reads like one; it isn't always first
+    name = next((line for line in lines if _is_name(line)), None)
+    details = " ".join(line for line in lines if line is not name)
+    contacts = []
+    for email in EMAIL.findall(details):
+        icon = "\\raisebox{-0.2\\height}\\faEnvelope\\ " if icons else ""
+        contacts.append(f"\\href{{mailto:{_escape_href(email)}}}{{{icon}\\underline{{{escape_latex(email)}}}}}")
+        details = details.replace(email, " ")
+    for phone in filter(_is_phone, PHONE.findall(details)):
+        icon = "\\raisebox{-0.1\\height}\\faPhone\\ " if icons else ""
+        contacts.insert(0, f"{icon}{escape_latex(phone.strip())}")
+        details = details.replace(phone, " ")
+    for url in URL.findall(details):
+        href = url if url.lower().startswith("http") else f"https://{url}"
+        icon = f"\\raisebox{{-0.2\\height}}{_url_icon(url)}\\ " if icons else ""
+        contacts.append(f"\\href{{{_escape_href(href)}}}{{{icon}\\underline{{{escape_latex(_url_label(url))}}}}}")
+        details = details.replace(url, " ")
+    # Whatever is left (city, labels such as "Email:") minus separators
+    leftover = CONTACT_LABEL.sub(" ", details)
+    leftover = re.sub(r"\s*[|,;•]\s*", ", ", re.sub(r"\s+", " ", leftover)).strip(" ,")
+    out = ["\\begin{center}"]
+    if name:
+        out.append(f"    {{\\Huge \\scshape {escape_latex(name)}}} \\\\ \\vspace{{4pt}}")
+    if leftover:
+        out.append(f"    {escape_latex(leftover)} \\\\ \\vspace{{4pt}}")
+    if contacts:
+        out.append("    \\small " + " ~\n    ".join(contacts))
+    out += ["    \\vspace{-8pt}", "\\end{center}"]
+    return "\n".join(out)
+
+
+# --- SECTION BODIES ---
+def _take_date(line):
+    """Return (line without its trailing date range, date in the template's "A -- B" form)."""
+    match = DATE_RANGE.search(line)
+    if not match:
+        return line, ""
+    date = re.sub(r"\s*[-–—]\s*|\s+to\s+", " -- ", match.group(1).strip(), count=1, flags=re.IGNORECASE)
+    return line[:match.start()].rstrip(" ,|-–—("), date
+
+
+def _split_heading(line):
+    """Split an entry heading into (title, date, subtitle, location, split at a comma)."""
+    line, date = _take_date(line)
+    parts = [p.strip() for p in re.split(r"\s+[|–—-]\s+|\s*\|\s*", line) if p.strip()]
+    by_comma = len(parts) < 2 and ", " in line
+    if by_comma:
+        # Only ", " separates fields; "26,000+" stays whole
+        parts = [p.strip() for p in line.split(", ", 1)]
+    title = parts[0] if parts else line
+    subtitle = parts[1] if len(parts) > 1 else ""
+    location = ", ".join(parts[2:]) if len(parts) > 2 else ""
+    return title, date, subtitle, location, by_comma
+
+
+def _render_items(items, indent="    "):
+    out = [f"{indent}\\resumeItemListStart"]
+    out += [f"{indent}  \\resumeItem{{{escape_latex(item)}}}" for item in items]
+    out.append(f"{indent}\\resumeItemListEnd")
+    return out
+
+
+def _new_entry(line):
+    title, date, subtitle, location, by_comma = _split_heading(_strip_item(line))
+    return {"title": title, "date": date, "subtitles": [subtitle] if subtitle else [],
+            "location": location, "by_comma": by_comma, "extra": [], "items": []}
+
+
+def _add_heading_line(entry, line):
+    # Degree, role or company under the first heading line; never dropped
+    text, date = _take_date(line)
+    if date and entry["date"]:
+        # A second date stays with its text
+        entry["extra"].append(line)
+        return
+    entry["date"] = entry["date"] or date
+    if text and entry["title"]:
+        entry["extra"].append(text)
+    elif text:
+        # The entry so far was only a date line
+        title, _, subtitle, location, by_comma = _split_heading(text)
+        entry.update(title=title, subtitles=[subtitle] if subtitle else [],
+                     location=entry["location"] or location, by_comma=by_comma)
+
+
+def _continues(item, line):
+    return line[:1].islower() or bool(OPEN_ENDING.search(item))
+
+
+def render_entries(content):
+    entries = []
+    for line in _lines(content):
+        entry = entries[-1] if entries else None
+        date_only = DATE_RANGE.match(line)
+        if entry and _is_item(line):
+            entry["items"].append(_strip_item(line))
+        elif date_only:
+            # "September 2023 – Present" on its own line dates the entry above
+            if entry and not entry["date"]:
+                _add_heading_line(entry, line)
+            else:
+                entries.append(dict(_new_entry(""), date=_take_date(line)[1]))
+        elif entry and not entry["items"] and not entry["location"] and LOCATION.match(line):
+            entry["location"] = line
+        elif entry and entry["items"] and _continues(entry["items"][-1], line):
+            # Wrapped bullet
+            entry["items"][-1] += " " + line
+        elif entry and len(line) > 90:
+            # Unbulleted description under a heading
+            entry["items"].append(line)
+        elif entry and not entry["items"] and not entry["extra"] and not (entry["date"] and DATE_RANGE.search(line)):
+            # Second heading line (e.g. degree or role under the institution)
+            _add_heading_line(entry, line)
+        else:
+            entries.append(_new_entry(line))
+    out = ["\\resumeSubHeadingListStart"]
+    for entry in entries:
+        subtitles, location = entry["subtitles"], entry["location"]
+        if entry["extra"] and entry["by_comma"] and not location:
+            # "Institute, City" over a degree line: the comma part is the place
+            subtitles, location = [], ", ".join(subtitles)
+        subtitle = ", ".join(subtitles + entry["extra"])
+        out.append("  \\resumeSubheading")
+        out.append(f"    {{{escape_latex(entry['title'])}}}{{{escape_latex(entry['date'])}}}")
+        out.append(f"    {{{escape_latex(subtitle)}}}{{{escape_latex(location)}}}")
+        if entry["items"]:
+            out += _render_items(entry["items"])
+    out.append("\\resumeSubHeadingListEnd")
+    return "\n".join(out)
+
+
+def render_list(content):
+    out = ["\\begin{itemize}[leftmargin=0.35in, itemsep=0pt, label={\\tiny$\\bullet$}]"]
+    out += [f"  \\item \\small {escape_latex(_strip_item(line))}" for line in _lines(content)]
+    out.append("\\end{itemize}")
+    return "\n".join(out)
+
+
+def render_labelled_list(content):
+    out = ["\\begin{itemize}[leftmargin=0.35in, itemsep=0pt, label={\\tiny$\\bullet$}]"]
+    for line in _lines(content):
+        line = _strip_item(line)
+        label, sep, values = line.partition(":")
+        if sep and values.strip() and len(label) <= 40:
+            out.append(f"  \\item \\textbf{{{escape_latex(label.strip())}}}{{: {escape_latex(values.strip())}}}")
+        else:
+            out.append(f"  \\item \\small {escape_latex(line)}")
+    out.append("\\end{itemize}")
+    return "\n".join(out)
+
+
+def render_columns(content):
+    items = []
+    for line in _lines(content):
+        line = _strip_item(line)
+        items += [part.strip() for part in line.split(",")] if "," in line else [line]
+    out = ["\\begin{multicols}{3}", "  \\begin{itemize}[itemsep=-5pt, parsep=3pt]"]
+    out += [f"    \\item\\small {escape_latex(item)}" for item in items if item]
+    out += ["  \\end{itemize}", "\\end{multicols}"]
+    return "\n".join(out)
+
+
+def render_paragraph(content):
+    return f"\\small{{{escape_latex(' '.join(_lines(content)))}}}"
+
+
+_RENDERERS = {
+    "paragraph": render_paragraph,
+    "list": render_list,
+    "labelled_list": render_labelled_list,
+    "columns": render_columns,
+    "entries": render_entries,
+}
+
+
+def _render_with_gemini(title, content, preamble, gemini_api_key):
+    macros = "\n".join(line for line in preamble.splitlines() if "command" in line)
+    prompt = f"""
+Convert this resume section to LaTeX for the resume template whose custom commands are listed below.
+Return only the LaTeX for this one section, starting with \\section{{{title}}}. No preamble, no \\begin{{document}}, no explanation and no markdown fences.
+Keep it concise and escape LaTeX special characters.
+
+COMMANDS:
+{macros}
+
+SECTION:
+{title}
+{content}
+"""
+    latex = generate_text(prompt, gemini_api_key).strip()
+    latex = re.sub(r"^```(?:latex)?\s*|\s*```$", "", latex)
+    if "\\section" not in latex:
+        raise ValueError("Gemini did not return a LaTeX section.")
+    return latex
+
+
+def render_latex_resume(resume_text, latex_template, gemini_api_key=None, stats=None):
+    """
+    Fill the template's macros with sectioned resume text locally.
+    Args:
+        resume_text (str): Resume in "--- SECTION ---" blocks.
+        latex_template (str): Template whose preamble (and macros) are reused.
+        gemini_api_key (str): Optional; used only for sections that have no
+            local layout. Without it those sections are rendered as a plain list.
+        stats (dict): Optional; receives "unplaced", the input lines missing
+            from the rendered body (empty when everything was placed). Text
+            before the first block that isn't a name or contact details
+            (e.g. suggestions) is left out and listed there too.
+    Returns:
+        str: The complete LaTeX document, or None when the text has no
+        section blocks or the template lacks the expected macros.
+    """
+    preamble = split_preamble(latex_template)[0]
+    if preamble is None or not all(macro in preamble for macro in REQUIRED_MACROS):
+        return None
+    stats = stats if stats is not None else {}
+    blocks = parse_sectioned_text(resume_text)
+    if not blocks:
+        return None
+    icons = "fontawesome5" in preamble
+
+    contact = []
+    body = []
+    rejected = []
+    for title, content in blocks:
+        if title == HEADER_BLOCK:
+            lines = _lines(content)
+            rejected = [line for line in lines if not _is_contact_line(line)]
+            content = "\n".join(line for line in lines if _is_contact_line(line))
+        if not content:
+            continue
+        canonical = canonical_section(title)
+        if canonical in ("Contact Information", "Other"):
+            # Name and contact details: the leading block, "Other" from split_sections
+            contact.append(content)
+            continue
+        style = SECTION_STYLES.get(canonical)
+        section_title = SECTION_TITLES.get(canonical, canonical or title.title())
+        if style:
+            body.append(f"\\section{{{escape_latex(section_title)}}}\n{_RENDERERS[style](content)}")
+            continue
+        if gemini_api_key:
+            try:
+                body.append(_render_with_gemini(section_title, content, preamble, gemini_api_key))
+                continue
+            except Exception as e:
+                print(f"Could not render section '{title}' with Gemini ({e}); using a plain list.")
+        body.append(f"\\section{{{escape_latex(section_title)}}}\n{render_list(content)}")
+
+    header = render_header("\n".join(contact), icons=icons)
+    if header:
+        body.insert(0, header)
+    unplaced = unplaced_lines(resume_text, "\n".join(body))
+    stats["unplaced"] = rejected + [line for line in unplaced if line not in rejected]
+    parts = [preamble.rstrip(), "", "\\begin{document}", ""]
+    parts += ["\n\n".join(body), "", "\\end{document}", ""]
+    return "\n".join(parts)
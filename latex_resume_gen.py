@@ -1,7 +1,8 @@
-import google.generativeai as genai
+from gemini_client import generate_text, generate_text_async, stream_text
+from tracing import stage
 
-def generate_latex_resume(latex_template, resume_text, gemini_api_key):
-    prompt = f"""
+def build_latex_prompt(latex_template, resume_text):
+    return f"""
 You are a LaTeX expert and resume formatter.
 Given the following LaTeX resume template and resume data, fill the template with the resume data.
 Instructions:
@@ -15,16 +16,42 @@ LATEX TEMPLATE:
 RESUME DATA:
 {resume_text}
 """
-    genai.configure(api_key=gemini_api_key)
-    model = genai.GenerativeModel('gemini-2.5-pro')
-    response = model.generate_content(prompt)
-    # Robust error handling
+
+def _check_latex(latex_code):
+    latex_code = latex_code.strip()
+    if not latex_code:
+        raise ValueError("Empty LaTeX code returned.")
+    return latex_code
+
+def _report_latex_error(e):
+    print("Gemini did not return valid LaTeX code. Try reducing the template or resume size.")
+    print("Error details:", e)
+
+def generate_latex_resume(latex_template, resume_text, gemini_api_key):
+    prompt = build_latex_prompt(latex_template, resume_text)
+    with stage("latex_resume"):
+        # API and network errors propagate; only an unusable response gives ""
+        text = generate_text(prompt, gemini_api_key)
+        try:
+            return _check_latex(text)
+        except Exception as e:
+            _report_latex_error(e)
+            return ""
+
+async def generate_latex_resume_async(latex_template, resume_text, gemini_api_key):
+    prompt = build_latex_prompt(latex_template, resume_text)
+    text = await generate_text_async(prompt, gemini_api_key)
     try:
-        latex_code = response.text.strip()
-        if not latex_code:
-            raise ValueError("Empty LaTeX code returned.")
-        return latex_code
+        return _check_latex(text)
     except Exception as e:
-        print("Gemini did not return valid LaTeX code. Try reducing the template or resume size.")
-        print("Error details:", e)
-        return ""
\ No newline at end of file
+        _report_latex_error(e)
+        return ""
+
+def generate_latex_resume_stream(latex_template, resume_text, gemini_api_key, stats=None):
+    """
+    Like generate_latex_resume(), but yields the LaTeX code as it arrives.
+    Wrap it in contextlib.closing() if you may stop reading early; the
+    "latex_resume" stage stays open until the generator finishes or is closed.
+    """
+    with stage("latex_resume"):
+        yield from stream_text(build_latex_prompt(latex_template, resume_text), gemini_api_key, stats=stats)
\ No newline at end of file
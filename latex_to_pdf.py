@@ -1,21 +1,251 @@
 import subprocess
 import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from disk_cache import DiskCache, hash_bytes
+from pdf_to_image import pdf_to_image
+from tracing import stage
 
-def latex_to_pdf(latex_code, output_pdf):
-    # Save LaTeX code to a temporary .tex file
-    with open("temp.tex", "w", encoding="utf-8") as f:
-        f.write(latex_code)
-    
-    # Run pdflatex to create PDF
-    subprocess.run(["pdflatex", "-interaction=nonstopmode", "temp.tex"], stdout=subprocess.PIPE)
-    
-    # Rename/move the generated PDF
-    if os.path.exists("temp.pdf"):
-        os.rename("temp.pdf", output_pdf)
-        print(f"PDF created: {output_pdf}")
+# Every compile runs in its own temporary directory, so concurrent jobs never
+# share temp.tex/temp.pdf. LatexCompiler adds a bounded worker pool and can
+# precompile the shared template preamble into a format file (.fmt), so
+# each job only typesets the document body.
+
+LATEX_ENGINE = "pdflatex"
+DEFAULT_TIMEOUT = 60
+MAX_WORKERS = int(os.environ.get("LATEX_WORKERS", "2"))
+PAGES_PATTERN = re.compile(r"Output written on .*?\((\d+) pages?", re.DOTALL)
+PREVIEW_DPI = 200
+
+# Compiled PDFs and first-page previews, keyed by the LaTeX source plus the
+# engine version, so a repeat render is one file read instead of a TeX run.
+pdf_cache = DiskCache("pdf", max_bytes=int(os.environ.get("RESUME_PDF_CACHE_MB", "512")) * 1024 * 1024,
+                      suffix=".pdf")
+preview_cache = DiskCache("preview", max_bytes=int(os.environ.get("RESUME_PREVIEW_CACHE_MB", "256")) * 1024 * 1024,
+                          suffix=".png")
+
+
+def split_preamble(latex_code):
+    """Return (preamble, body) split at \\begin{document}, or (None, latex_code)."""
+    index = latex_code.find("\\begin{document}")
+    if index == -1:
+        return None, latex_code
+    return latex_code[:index], latex_code[index:]
+
+
+def build_preamble_format(preamble, format_dir, name="resume_preamble", timeout=DEFAULT_TIMEOUT):
+    """
+    Dump a LaTeX preamble into a pdflatex format file.
+    Returns:
+        str: Path to the .fmt file, or None if the format could not be built.
+    """
+    os.makedirs(format_dir, exist_ok=True)
+    with open(os.path.join(format_dir, f"{name}.tex"), "w", encoding="utf-8") as f:
+        f.write(preamble.rstrip() + "\n\\dump\n")
+    try:
+        subprocess.run([LATEX_ENGINE, "-ini", "-interaction=nonstopmode", f"-jobname={name}",
+                        f"&{LATEX_ENGINE}", f"{name}.tex"],
+                       cwd=format_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    format_file = os.path.join(format_dir, f"{name}.fmt")
+    return format_file if os.path.exists(format_file) else None
+
+
+def _run_engine(source, work_dir, timeout, format_file=None):
+    tex_path = os.path.join(work_dir, "resume.tex")
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(source)
+    cmd = [LATEX_ENGINE, "-interaction=nonstopmode", "-halt-on-error", "resume.tex"]
+    env = None
+    if format_file:
+        # TEXFORMATS with a trailing separator keeps the default search path too
+        env = dict(os.environ, TEXFORMATS=os.path.dirname(format_file) + os.pathsep)
+        cmd.insert(1, "-fmt=" + os.path.splitext(os.path.basename(format_file))[0])
+    proc = subprocess.run(cmd, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          timeout=timeout, env=env)
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+def compile_latex(latex_code, output_pdf=None, timeout=DEFAULT_TIMEOUT, format_file=None, format_preamble=None):
+    """
+    Compile LaTeX to PDF in a private temporary directory.
+    Args:
+        latex_code (str): Complete LaTeX document.
+        output_pdf (str): Where to write the PDF; if None the bytes are returned.
+        timeout (float): Seconds before pdflatex is killed.
+        format_file (str): Optional precompiled preamble from build_preamble_format();
+            used only when latex_code starts with exactly format_preamble.
+        format_preamble (str): The preamble format_file was built from.
+    Returns:
+        dict: {"ok", "pdf_path", "pdf_bytes", "pages", "seconds", "used_format", "log"}
+    """
+    start = time.perf_counter()
+    result = {"ok": False, "pdf_path": None, "pdf_bytes": None, "pages": None,
+              "seconds": None, "used_format": False, "log": ""}
+    preamble, body = split_preamble(latex_code)
+    use_format = bool(format_file and format_preamble is not None and preamble is not None
+                      and preamble.strip() == format_preamble.strip())
+    with stage("latex_compile", used_format=use_format), tempfile.TemporaryDirectory(prefix="latex_job_") as work_dir:
+        try:
+            log = _run_engine(body if use_format else latex_code, work_dir, timeout,
+                              format_file if use_format else None)
+            pdf_path = os.path.join(work_dir, "resume.pdf")
+            if use_format and not os.path.exists(pdf_path):
+                # Stale or incompatible format file: fall back to a full compile
+                use_format = False
+                log = _run_engine(latex_code, work_dir, timeout)
+        except subprocess.TimeoutExpired:
+            result["log"] = f"{LATEX_ENGINE} timed out after {timeout}s"
+            result["seconds"] = time.perf_counter() - start
+            return result
+        except OSError as e:
+            result["log"] = f"Could not run {LATEX_ENGINE}: {e}"
+            result["seconds"] = time.perf_counter() - start
+            return result
+        result["log"] = log
+        result["used_format"] = use_format
+        match = PAGES_PATTERN.search(log)
+        result["pages"] = int(match.group(1)) if match else None
+        if os.path.exists(pdf_path):
+            result["ok"] = True
+            if output_pdf:
+                shutil.move(pdf_path, output_pdf)
+                result["pdf_path"] = output_pdf
+            else:
+                with open(pdf_path, "rb") as f:
+                    result["pdf_bytes"] = f.read()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+class LatexCompiler:
+    """
+    Bounded pool of isolated LaTeX compile jobs.
+    Args:
+        workers (int): Maximum concurrent pdflatex processes.
+        timeout (float): Per-job timeout in seconds.
+        preamble (str): Optional shared preamble (e.g. from latex_template) to
+            precompile into a format file; documents with the same preamble
+            skip re-parsing it.
+        format_dir (str): Where to keep the format file (default: a temp dir).
+    """
+
+    def __init__(self, workers=MAX_WORKERS, timeout=DEFAULT_TIMEOUT, preamble=None, format_dir=None):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="latex")
+        self.preamble = preamble
+        self.format_file = None
+        if preamble:
+            format_dir = format_dir or tempfile.mkdtemp(prefix="latex_fmt_")
+            self.format_file = build_preamble_format(preamble, format_dir, timeout=timeout)
+
+    def compile(self, latex_code, output_pdf=None):
+        return compile_latex(latex_code, output_pdf, timeout=self.timeout,
+                             format_file=self.format_file, format_preamble=self.preamble)
+
+    def submit(self, latex_code, output_pdf=None):
+        """Queue a compile job; returns a Future resolving to the compile_latex() result."""
+        return self._executor.submit(self.compile, latex_code, output_pdf)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@lru_cache(maxsize=None)
+def engine_version():
+    try:
+        proc = subprocess.run([LATEX_ENGINE, "--version"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+    lines = proc.stdout.decode("utf-8", errors="replace").splitlines()
+    return lines[0].strip() if lines else "unknown"
+
+
+def pdf_cache_key(latex_code):
+    return hash_bytes(LATEX_ENGINE, engine_version(), latex_code)
+
+
+def compile_latex_cached(latex_code, output_pdf=None, compiler=None, timeout=DEFAULT_TIMEOUT):
+    """
+    compile_latex() backed by the compiled-PDF cache.
+    Args:
+        compiler (LatexCompiler): Optional compiler to use on a cache miss.
+    Returns:
+        dict: As compile_latex(), plus "cached". Page count is None on a hit.
+    """
+    start = time.perf_counter()
+    key = pdf_cache_key(latex_code)
+    pdf_bytes = pdf_cache.get(key)
+    if pdf_bytes is not None:
+        result = {"ok": True, "pdf_path": None, "pdf_bytes": None, "pages": None,
+                  "seconds": None, "used_format": False, "log": "", "cached": True}
+    else:
+        result = compiler.compile(latex_code) if compiler else compile_latex(latex_code, timeout=timeout)
+        result["cached"] = False
+        if not result["ok"]:
+            return result
+        pdf_bytes = result["pdf_bytes"]
+        pdf_cache.put(key, pdf_bytes)
+    if output_pdf:
+        with open(output_pdf, "wb") as f:
+            f.write(pdf_bytes)
+        result["pdf_path"] = output_pdf
+        result["pdf_bytes"] = None
+    else:
+        result["pdf_bytes"] = pdf_bytes
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def latex_to_preview(latex_code, image_path, compiler=None, dpi=PREVIEW_DPI):
+    """Render the first page of a LaTeX document to PNG, reusing cached previews and PDFs."""
+    key = hash_bytes(pdf_cache_key(latex_code), "preview", str(dpi))
+    png_bytes = preview_cache.get(key)
+    if png_bytes is None:
+        with tempfile.TemporaryDirectory(prefix="latex_preview_") as work_dir:
+            pdf_path = os.path.join(work_dir, "resume.pdf")
+            result = compile_latex_cached(latex_code, pdf_path, compiler=compiler)
+            if not result["ok"]:
+                print("Preview failed: the LaTeX code did not compile.")
+                return None
+            png_path = os.path.join(work_dir, "preview.png")
+            pdf_to_image(pdf_path, png_path, dpi=dpi)
+            with open(png_path, "rb") as f:
+                png_bytes = f.read()
+        preview_cache.put(key, png_bytes)
+    with open(image_path, "wb") as f:
+        f.write(png_bytes)
+    return image_path
+
+
+def cache_stats():
+    return {"pdf": pdf_cache.stats(), "preview": preview_cache.stats()}
+
+
+def latex_to_pdf(latex_code, output_pdf, use_cache=True):
+    if use_cache:
+        result = compile_latex_cached(latex_code, output_pdf)
+    else:
+        result = compile_latex(latex_code, os.path.abspath(output_pdf))
+    if result["ok"] and result.get("cached"):
+        print(f"PDF created: {output_pdf} (from cache)")
+    elif result["ok"]:
+        print(f"PDF created: {output_pdf} ({result['pages']} page(s), {result['seconds']:.1f}s)")
     else:
         print("PDF generation failed.")
-        
+    return result
+
 if __name__ == "__main__":
     latex_code = r"""
 \documentclass{article}
@@ -23,4 +253,4 @@ if __name__ == "__main__":
 Hello, \LaTeX!
 \end{document}
 """
-    latex_to_pdf(latex_code, "output.pdf")
\ No newline at end of file
+    latex_to_pdf(latex_code, "output.pdf")
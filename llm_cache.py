@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+import time
+from disk_cache import CACHE_ROOT, hash_bytes
+
+# Persistent cache of Gemini responses, keyed by model name + prompt hash.
+# Entries expire after a TTL and the least recently used ones are evicted
+# once the cache holds more than max_entries rows.
+
+DEFAULT_PATH = os.path.join(CACHE_ROOT, "llm_responses.sqlite3")
+DEFAULT_TTL = float(os.environ.get("RESUME_LLM_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESUME_LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def prompt_key(model_name, prompt):
+    return hash_bytes(model_name, prompt)
+
+
+class LLMCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, enabled=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, model_name, prompt):
+        """Return the cached response text, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+        key = prompt_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model_name, prompt, response):
+        if not self.enabled or not response:
+            return
+        key = prompt_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                         (key, model_name, response, now, now))
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        if self.ttl:
+            self.evictions += conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)).rowcount
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self.evictions += conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+        }
+
+
+# Shared instance used by gemini_client; RESUME_LLM_CACHE=off disables it.
+response_cache = LLMCache(enabled=os.environ.get("RESUME_LLM_CACHE", "on").lower() not in ("0", "off", "false", "no"))
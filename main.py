@@ -1,10 +1,78 @@
 import os
+import time
 import uuid
+from contextlib import closing
 from ats_general import analyze_resume
-from ats_job_des import get_ats_score_from_gemini
-from ats_resume_improve import improve_resume_with_gemini
-from ats_resume_rebuild import rebuild_resume_with_gemini
-from latex_resume_gen import generate_latex_resume
+from ats_job_des import get_ats_score_from_gemini, parse_ats_score, parse_resume
+from ats_resume_improve import improve_resume_with_gemini_stream, split_suggestions
+from ats_resume_rebuild import rebuild_resume_with_gemini_stream
+from gemini_client import GeminiError
+from job_match import CALIBRATE, log_match, score_job_match
+from latex_resume_gen import generate_latex_resume_stream
+from latex_renderer import render_latex_resume
+from tracing import start_from_env, stop_and_write_from_env
+
+def report_timing(stats):
+    if stats.get("cached"):
+        print("(served from the response cache)")
+    elif stats.get("ttft") is not None:
+        print(f"(first output after {stats['ttft']:.1f}s, finished in {stats['total']:.1f}s)")
+
+def show_stream(title, chunks, stats):
+    # Print Gemini output as it arrives instead of waiting for the whole response
+    parts = []
+    # Closing frees the Gemini slot even if printing is interrupted
+    with closing(chunks):
+        for chunk in chunks:
+            if not parts:
+                # Only now: a rebuild asks its gap questions before the first chunk
+                print(title)
+            print(chunk, end="", flush=True)
+            parts.append(chunk)
+    if not parts:
+        print(title)
+    print()
+    report_timing(stats)
+    return "".join(parts).strip()
+
+def save_latex_resume(prefix, resume_text, gemini_api_key):
+    stats = {}
+    unique_id = uuid.uuid4().hex[:8]
+    latex_filename = f"{prefix}_{unique_id}.tex"
+    # Fill the template locally when the resume is in "--- SECTION ---" blocks;
+    # Gemini is then only asked about sections that have no local layout.
+    start = time.perf_counter()
+    render_stats = {}
+    latex_code = render_latex_resume(resume_text, latex_template, gemini_api_key, stats=render_stats)
+    if latex_code and not render_stats["unplaced"]:
+        with open(latex_filename, "w", encoding="utf-8") as f:
+            f.write(latex_code)
+        print(f"LaTeX code saved as {latex_filename} (rendered locally in {time.perf_counter() - start:.2f}s)")
+        return
+    if latex_code:
+        # Lose nothing: Gemini writes the whole document instead
+        print(f"{len(render_stats['unplaced'])} line(s) did not fit the local layout.")
+    print("\nGenerating LaTeX code...")
+    written = 0
+    # Write the .tex file chunk by chunk while Gemini is still generating
+    with open(latex_filename, "w", encoding="utf-8") as f:
+        try:
+            with closing(generate_latex_resume_stream(latex_template, resume_text, gemini_api_key,
+                                                      stats=stats)) as chunks:
+                for chunk in chunks:
+                    if not written:
+                        chunk = chunk.lstrip()
+                    if chunk:
+                        f.write(chunk)
+                        f.flush()
+                        written += len(chunk)
+            if not written:
+                raise ValueError("Empty LaTeX code returned.")
+        except Exception as e:
+            print("Gemini did not return valid LaTeX code. Try reducing the template or resume size.")
+            print("Error details:", e)
+    print(f"LaTeX code saved as {latex_filename}")
+    report_timing(stats)
 
 def main():
     print("Select an option:")
@@ -29,61 +97,63 @@ def main():
         # ATS with job description and improve if needed
         job_title = input("Enter the job title you are applying for: ")
         job_description = input("Paste the job description here:\n")
-        ats_feedback = get_ats_score_from_gemini(resume_path, job_description, gemini_api_key)
-        print("\nGemini ATS Feedback:")
-        print(ats_feedback)
-        import re
-        match = re.search(r'ATS score\s*[:\-]?\s*(\d+)', ats_feedback, re.IGNORECASE)
-        score = int(match.group(1)) if match else 0
+        if not job_description.strip():
+            # An empty description would score 0 and send the resume straight to a rebuild
+            print("The job description is empty. Please run the program again and paste it.")
+            return
+        # Extract and split the resume once; every Gemini step below reuses it
+        resume = parse_resume(resume_path)
+        # Local pre-screen: only an ambiguous match needs the Gemini score
+        match = score_job_match(resume.sections, job_description)
+        print(f"\nLocal job match: {match['score']:.0f}/100 ({match['band']} match)")
+        if match["missing"]:
+            print("Missing keywords:", ", ".join(match["missing"][:5]))
+        gemini_score = None
+        if match["band"] == "ambiguous" or CALIBRATE:
+            ats_feedback = get_ats_score_from_gemini(resume, job_description, gemini_api_key)
+            print("\nGemini ATS Feedback:")
+            print(ats_feedback)
+            gemini_score = parse_ats_score(ats_feedback)
+        log_match(match, job_description, gemini_score, resume_path)
+        if gemini_score is not None:
+            score = gemini_score
+        else:
+            # Decided locally: map the band onto the Gemini thresholds below
+            score = 100 if match["band"] == "strong" else 0
 
         if score >= 70:
             print("\nYou are a good fit for this job according to your resume!")
         elif 65 < score < 70:
             print("\nYour score is close! Improving your resume...")
-            improved_resume = improve_resume_with_gemini(resume_path, job_description, gemini_api_key)
-            print("\nImproved Resume:\n", improved_resume)
-            latex_code = generate_latex_resume(latex_template, improved_resume, gemini_api_key)
-            unique_id = uuid.uuid4().hex[:8]
-            latex_filename = f"improved_resume_{unique_id}.tex"
-            with open(latex_filename, "w", encoding="utf-8") as f:
-                f.write(latex_code)
-            print(f"LaTeX code saved as {latex_filename}")
+            stats = {}
+            improved_resume = show_stream("\nImproved Resume:", improve_resume_with_gemini_stream(
+                resume, job_description, gemini_api_key, stats=stats), stats)
+            # Only the resume goes into the LaTeX file, not the suggestions above it
+            save_latex_resume("improved_resume", split_suggestions(improved_resume)[1], gemini_api_key)
         elif score <= 60:
             print("\nYour score is low. Let's rebuild your resume for this job...")
-            rebuilt_resume = rebuild_resume_with_gemini(resume_path, job_title, job_description, gemini_api_key)
-            print("\nRebuilt Resume:\n", rebuilt_resume)
-            latex_code = generate_latex_resume(latex_template, rebuilt_resume, gemini_api_key)
-            unique_id = uuid.uuid4().hex[:8]
-            latex_filename = f"rebuilt_resume_{unique_id}.tex"
-            with open(latex_filename, "w", encoding="utf-8") as f:
-                f.write(latex_code)
-            print(f"LaTeX code saved as {latex_filename}")
+            stats = {}
+            rebuilt_resume = show_stream("\nRebuilt Resume:", rebuild_resume_with_gemini_stream(
+                resume, job_title, job_description, gemini_api_key, stats=stats), stats)
+            save_latex_resume("rebuilt_resume", rebuilt_resume, gemini_api_key)
         else:
             print("\nYour score is in the mid-range. Please review your resume and try again.")
 
     elif user_choice == "3":
         # Directly enhance resume by rewriting (no job description)
-        improved_resume = improve_resume_with_gemini(resume_path, "", gemini_api_key)
-        print("\nEnhanced Resume:\n", improved_resume)
-        latex_code = generate_latex_resume(latex_template, improved_resume, gemini_api_key)
-        unique_id = uuid.uuid4().hex[:8]
-        latex_filename = f"enhanced_resume_{unique_id}.tex"
-        with open(latex_filename, "w", encoding="utf-8") as f:
-            f.write(latex_code)
-        print(f"LaTeX code saved as {latex_filename}")
+        stats = {}
+        improved_resume = show_stream("\nEnhanced Resume:", improve_resume_with_gemini_stream(
+            resume_path, "", gemini_api_key, stats=stats), stats)
+        save_latex_resume("enhanced_resume", split_suggestions(improved_resume)[1], gemini_api_key)
 
     elif user_choice == "4":
         # Directly rebuild resume according to job description
         job_title = input("Enter the job title you are applying for: ")
         job_description = input("Paste the job description here:\n")
-        rebuilt_resume = rebuild_resume_with_gemini(resume_path, job_title, job_description, gemini_api_key)
-        print("\nRebuilt Resume:\n", rebuilt_resume)
-        latex_code = generate_latex_resume(latex_template, rebuilt_resume, gemini_api_key)
-        unique_id = uuid.uuid4().hex[:8]
-        latex_filename = f"rebuilt_resume_{unique_id}.tex"
-        with open(latex_filename, "w", encoding="utf-8") as f:
-            f.write(latex_code)
-        print(f"LaTeX code saved as {latex_filename}")
+        stats = {}
+        rebuilt_resume = show_stream("\nRebuilt Resume:", rebuild_resume_with_gemini_stream(
+            resume_path, job_title, job_description, gemini_api_key, stats=stats), stats)
+        save_latex_resume("rebuilt_resume", rebuilt_resume, gemini_api_key)
 
     else:
         print("Invalid option. Please run the program again and select 1, 2, 3, or 4.")
@@ -313,4 +383,12 @@ latex_template = r"""
 """
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # RESUME_TRACE / RESUME_TRACE_CHROME / RESUME_PROFILE turn on stage tracing
+    start_from_env()
+    try:
+        main()
+    except GeminiError as e:
+        print(f"\n{e}")
+        raise SystemExit(1)
+    finally:
+        stop_and_write_from_env()
\ No newline at end of file
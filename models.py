@@ -0,0 +1,72 @@
+import sys
+import threading
+
+# Shared registry for the heavy NLP/OCR models. Nothing is loaded at import
+# time: each model is built on first use and then reused by every module.
+
+SPACY_MODEL = "en_core_web_sm"
+# Components the ATS scoring checks don't use (they only need sentence
+# boundaries and dependency labels, i.e. tok2vec + parser).
+SCORING_EXCLUDE = ("tagger", "attribute_ruler", "lemmatizer", "ner")
+OCR_LANGUAGES = ("en",)
+
+_models = {}
+_lock = threading.Lock()
+
+
+def _load_spacy(exclude=()):
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL, exclude=list(exclude))
+    except OSError:
+        import subprocess
+        subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+        return spacy.load(SPACY_MODEL, exclude=list(exclude))
+
+
+def _load_reader():
+    import easyocr
+    return easyocr.Reader(list(OCR_LANGUAGES))
+
+
+_LOADERS = {
+    "nlp": _load_spacy,
+    "nlp_scoring": lambda: _load_spacy(exclude=SCORING_EXCLUDE),
+    "reader": _load_reader,
+}
+
+
+def _get(name):
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                model = _LOADERS[name]()
+                _models[name] = model
+    return model
+
+
+def get_nlp():
+    """Return the shared spaCy pipeline, loading it on first use."""
+    return _get("nlp")
+
+
+def get_scoring_nlp():
+    """Return the trimmed spaCy pipeline used for ATS content scoring."""
+    return _get("nlp_scoring")
+
+
+def get_reader():
+    """Return the shared EasyOCR reader, loading it on first use."""
+    return _get("reader")
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def warm_up(names=("nlp_scoring", "reader")):
+    """Load models ahead of time, e.g. at the start of a long-lived worker."""
+    for name in names:
+        _get(name)
@@ -0,0 +1,103 @@
+import os
+import time
+import numpy as np
+from PIL import Image, ImageOps
+from models import get_reader
+from tracing import stage
+
+# OCR stage for image resumes: normalise each image (EXIF rotation, grayscale,
+# longest side capped) before EasyOCR sees it, and push several images through
+# the shared reader in one batched call.
+
+MAX_SIDE = int(os.environ.get("OCR_MAX_SIDE", "2000"))
+BATCH_SIZE = int(os.environ.get("OCR_BATCH_SIZE", "8"))
+IMAGES_PER_BATCH = int(os.environ.get("OCR_IMAGES_PER_BATCH", "4"))
+
+
+def prepare_image(image, max_side=MAX_SIDE, grayscale=True):
+    """
+    Load and normalise an image for recognition.
+    Args:
+        image (str or PIL.Image): File path or image.
+        max_side (int): Downscale so the longest side is at most this many pixels (0 keeps full size).
+        grayscale (bool): Convert to a single channel.
+    Returns:
+        numpy.ndarray: The prepared image.
+    """
+    if isinstance(image, str):
+        # Close the file once the converted copy is made
+        with Image.open(image) as opened:
+            return _normalize(opened, max_side, grayscale)
+    return _normalize(image, max_side, grayscale)
+
+
+def _normalize(image, max_side, grayscale):
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("L" if grayscale else "RGB")
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return np.asarray(image)
+
+
+def _pad_to(array, height, width):
+    # Pad with white to a common shape so images can share one batched call
+    shape = (height, width) + array.shape[2:]
+    padded = np.full(shape, 255, dtype=array.dtype)
+    padded[:array.shape[0], :array.shape[1]] = array
+    return padded
+
+
+def ocr_images(images, max_side=MAX_SIDE, grayscale=True, batch_size=BATCH_SIZE, workers=0,
+               paragraph=False, images_per_batch=IMAGES_PER_BATCH, timings=None):
+    """
+    OCR several images with the shared EasyOCR reader.
+    Args:
+        images (list): File paths or PIL images.
+        max_side (int): Longest-side cap applied before recognition (0 = full resolution).
+        grayscale (bool): Recognise single-channel images.
+        batch_size (int): EasyOCR recognition batch size.
+        workers (int): EasyOCR data-loader workers.
+        paragraph (bool): Let EasyOCR merge boxes into paragraphs.
+        images_per_batch (int): Images sent through one readtext_batched() call (1 = one call each).
+        timings (list): Optional; receives one dict per image with "prepare",
+            "recognize" (amortised over its batch), "total" seconds and "shape".
+    Returns:
+        list of str: Recognised text per image, lines joined with newlines.
+    """
+    reader = get_reader()
+    texts = []
+    step = max(1, images_per_batch)
+    # Prepare one group at a time so only a batch of decoded images is held
+    for i in range(0, len(images), step):
+        group = []
+        prepare_times = []
+        for image in images[i:i + step]:
+            start = time.perf_counter()
+            group.append(prepare_image(image, max_side=max_side, grayscale=grayscale))
+            prepare_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        if len(group) == 1:
+            results = [reader.readtext(group[0], detail=0, batch_size=batch_size, workers=workers,
+                                       paragraph=paragraph)]
+        else:
+            height = max(a.shape[0] for a in group)
+            width = max(a.shape[1] for a in group)
+            results = reader.readtext_batched([_pad_to(a, height, width) for a in group], detail=0,
+                                              batch_size=batch_size, workers=workers, paragraph=paragraph)
+        recognize_s = (time.perf_counter() - start) / len(group)
+        texts += ["\n".join(lines) for lines in results]
+        if timings is not None:
+            for array, prepare_s in zip(group, prepare_times):
+                timings.append({"prepare": prepare_s, "recognize": recognize_s,
+                                "total": prepare_s + recognize_s, "shape": array.shape})
+    return texts
+
+
+def ocr_settings():
+    """Settings that change ocr_image() output, for cache keys."""
+    return f"max_side={MAX_SIDE}"
+
+
+def ocr_image(image, **options):
+    with stage("ocr", max_side=options.get("max_side", MAX_SIDE)):
+        return ocr_images([image], **options)[0]
@@ -0,0 +1,189 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams, LTChar, LTContainer
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from ocr import ocr_image
+from pdf_to_image import render_pages
+from tracing import stage
+
+# PDF text with an OCR fallback for scanned pages. A page whose resources
+# reference no font cannot carry a text layer, so that check (no content
+# stream parsing) decides which pages pdfminer skips. Those pages, and pages
+# whose fonts yield no text (an invisible or outlined/Type3 font layer over
+# a scan), are rasterised and OCR'd. Pages are processed and yielded one at
+# a time, so only the current page's layout objects are held in memory.
+
+OCR_DPI = 200
+OCR_WORKERS = int(os.environ.get("PDF_OCR_WORKERS", "2"))
+MAX_FORM_DEPTH = 3
+# Pages read from a PDF (0 = all); later pages such as appendices are ignored
+MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "0"))
+# "off" skips pdfminer's layout analysis and writes text in content-stream order
+LAYOUT = os.environ.get("PDF_LAYOUT", "on").lower() != "off"
+# Worker processes for reading text pages (1 = in the calling process)
+WORKERS = int(os.environ.get("PDF_WORKERS", "1"))
+# Each worker parses the document and walks the page tree to reach its run of
+# pages, so runs are few and long: one per worker, and never shorter than this
+MIN_PAGES_PER_WORKER = 16
+
+
+def _has_fonts(resources, depth=0):
+    resources = resolve1(resources)
+    if not isinstance(resources, dict):
+        return False
+    if resolve1(resources.get("Font")):
+        return True
+    if depth >= MAX_FORM_DEPTH:
+        return False
+    # Text can also sit inside form XObjects with their own resources
+    xobjects = resolve1(resources.get("XObject"))
+    for xobject in (xobjects.values() if isinstance(xobjects, dict) else []):
+        attrs = getattr(resolve1(xobject), "attrs", {})
+        if getattr(attrs.get("Subtype"), "name", None) == "Form" and _has_fonts(attrs.get("Resources"), depth + 1):
+            return True
+    return False
+
+
+def page_count(file_path):
+    with open(file_path, "rb") as f:
+        return resolve1(resolve1(PDFDocument(PDFParser(f)).catalog["Pages"])["Count"])
+
+
+class PlainTextConverter(TextConverter):
+    """TextConverter without layout analysis: characters in content-stream order,
+    with a newline when the baseline moves and a space at wide gaps."""
+
+    def __init__(self, rsrcmgr, outfp):
+        super().__init__(rsrcmgr, outfp, laparams=None)
+
+    def receive_layout(self, ltpage):
+        last = None
+
+        def render(item):
+            nonlocal last
+            if isinstance(item, LTChar):
+                if last is not None:
+                    if abs(item.y0 - last.y0) > last.size * 0.5:
+                        self.write_text("\n")
+                    elif item.x0 - last.x1 > last.size * 0.2:
+                        self.write_text(" ")
+                self.write_text(item.get_text())
+                last = item
+            elif isinstance(item, LTContainer):
+                for child in item:
+                    render(child)
+
+        render(ltpage)
+        self.write_text("\n\f")
+
+
+def _iter_pages(file_path, first, last, laparams, layout):
+    # Text of pages first..last-1 (None where there is no text layer)
+    buffer = io.StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = TextConverter(rsrcmgr, buffer, laparams=laparams) if layout else PlainTextConverter(rsrcmgr, buffer)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    with open(file_path, "rb") as f:
+        for index, page in enumerate(PDFPage.create_pages(PDFDocument(PDFParser(f)))):
+            if last is not None and index >= last:
+                break
+            if index < first:
+                continue
+            if not _has_fonts(page.resources):
+                yield index, None
+                continue
+            interpreter.process_page(page)
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            yield index, text.rstrip("\f")
+    device.close()
+
+
+def _read_pages(file_path, first, last, laparams, layout):
+    # Worker-process entry point: opens the file itself
+    return list(_iter_pages(file_path, first, last, laparams, layout))
+
+
+def iter_pdf_pages(file_path, max_pages=MAX_PAGES, laparams=None, layout=LAYOUT, workers=1):
+    """
+    Yield the text of a PDF one page at a time.
+    Args:
+        file_path (str): PDF file.
+        max_pages (int): Stop after this many pages (0 = all).
+        laparams (LAParams): Layout analysis settings (default: pdfminer's defaults).
+        layout (bool): False skips layout analysis (faster, text in content-stream order).
+        workers (int): Worker processes, capped at the CPU count; above 1, each
+            reads one run of pages in parallel, still yielded in page order.
+    Yields:
+        tuple: (page_index, text), where text is None for a page without a text layer.
+    """
+    laparams = laparams or LAParams()
+    workers = min(workers, os.cpu_count() or 1)
+    total = page_count(file_path) if workers > 1 else 0
+    if max_pages:
+        total = min(total, max_pages)
+    run = max(MIN_PAGES_PER_WORKER, -(-total // workers)) if workers > 1 else 0
+    if run >= total:
+        yield from _iter_pages(file_path, 0, max_pages or None, laparams, layout)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_read_pages, file_path, first, min(first + run, total), laparams, layout)
+                   for first in range(0, total, run)]
+        for future in futures:
+            yield from future.result()
+
+
+def _ocr_page(file_path, page_index):
+    image = render_pages(file_path, (page_index + 1,), dpi=OCR_DPI, grayscale=True)[0]
+    return ocr_image(image)
+
+
+def extract_pdf_text(file_path, stats=None, ocr_workers=OCR_WORKERS, max_pages=MAX_PAGES, layout=LAYOUT,
+                     workers=WORKERS):
+    """
+    Extract the text of a PDF, OCR-ing only the pages without usable text
+    (no fonts, or only whitespace from pdfminer).
+    Args:
+        file_path (str): PDF file.
+        stats (dict): Optional; receives "pages", "ocr_pages", "text_seconds"
+            and "ocr_seconds" (time spent on the OCR fallback).
+        ocr_workers (int): Pages rendered and OCR'd at once.
+        max_pages (int), layout (bool), workers (int): As for iter_pdf_pages().
+    Returns:
+        str: Page texts in page order, each followed by a form feed (as pdfminer does).
+    """
+    start = time.perf_counter()
+    with stage("pdf_text", layout=layout) as attrs:
+        texts = [text for _, text in iter_pdf_pages(file_path, max_pages=max_pages, layout=layout,
+                                                            workers=workers)]
+        attrs["pages"] = len(texts)
+    scanned_pages = [i for i, text in enumerate(texts) if text is None or not text.strip()]
+    text_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if scanned_pages:
+        with stage("ocr_fallback", pages=len(scanned_pages)), \
+                ThreadPoolExecutor(max_workers=max(1, ocr_workers)) as executor:
+            ocr_texts = executor.map(lambda i: _ocr_page(file_path, i), scanned_pages)
+            for i, text in zip(scanned_pages, ocr_texts):
+                # Keep pdfminer's (blank) text if OCR finds nothing either
+                texts[i] = text if text.strip() or texts[i] is None else texts[i]
+    ocr_seconds = time.perf_counter() - start
+
+    if stats is not None:
+        stats.update(pages=len(texts), ocr_pages=len(scanned_pages),
+                     text_seconds=text_seconds, ocr_seconds=ocr_seconds)
+    return "".join(text + "\f" for text in texts)
+
+
+def pdf_settings():
+    """Settings that change extract_pdf_text() output, for cache keys."""
+    return f"max_pages={MAX_PAGES};layout={LAYOUT}"
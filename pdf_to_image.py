@@ -1,7 +1,86 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pdf2image import convert_from_path
 
-def pdf_to_image(pdf_path, image_path):
-    pages = convert_from_path(pdf_path, dpi=200)
+# Previews rasterise only the pages asked for (poppler's first_page/last_page),
+# so time and memory don't grow with the length of the PDF.
+
+DEFAULT_DPI = 200
+THUMBNAIL_SIZE = (300, 400)
+
+
+def _page_runs(pages):
+    # Group 1-based page numbers into contiguous (first, last) runs
+    runs = []
+    for page in sorted(set(pages)):
+        if runs and page == runs[-1][1] + 1:
+            runs[-1][1] = page
+        else:
+            runs.append([page, page])
+    return runs
+
+
+def render_pages(pdf_path, pages=(1,), dpi=DEFAULT_DPI, size=None, grayscale=False):
+    """
+    Rasterise only the requested pages of a PDF.
+    Args:
+        pdf_path (str): PDF file.
+        pages (iterable of int): 1-based page numbers.
+        dpi (int): Render resolution, ignored for dimensions fixed by size.
+        size (tuple): Optional target pixel size, e.g. (None, 800) for 800px
+            tall with the aspect ratio kept.
+        grayscale (bool): Render in grayscale.
+    Returns:
+        list of PIL.Image: One image per page, in page order (pages past the end are skipped).
+    """
+    images = []
+    for first, last in _page_runs(pages):
+        images += convert_from_path(pdf_path, dpi=dpi, first_page=first, last_page=last,
+                                    size=size, grayscale=grayscale)
+    return images
+
+
+def pdf_to_image(pdf_path, image_path, dpi=DEFAULT_DPI, size=None):
     # Save the first page as image
+    pages = render_pages(pdf_path, (1,), dpi=dpi, size=size)
     pages[0].save(image_path, 'PNG')
-    print(f"Image saved: {image_path}")
\ No newline at end of file
+    print(f"Image saved: {image_path}")
+
+
+def make_thumbnail(pdf_path, image_path, max_size=THUMBNAIL_SIZE):
+    """Save a first-page thumbnail that fits within max_size (width, height)."""
+    # Render straight at thumbnail width instead of downscaling a 200 dpi page
+    page = render_pages(pdf_path, (1,), size=(max_size[0], None))[0]
+    page.thumbnail(max_size)
+    page.save(image_path, 'PNG')
+    return image_path
+
+
+def render_previews(pdf_paths, output_dir, dpi=DEFAULT_DPI, size=None, thumbnail=False, workers=4):
+    """
+    Render first-page previews for many PDFs in parallel (one poppler process each).
+    A path listed more than once is rendered once.
+    Returns:
+        list of str: The PNG path for each PDF, or None where rendering failed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def render(pdf_path):
+        # Same-named PDFs from different directories must not share a preview file
+        digest = hashlib.sha256(os.path.abspath(pdf_path).encode("utf-8")).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        image_path = os.path.join(output_dir, f"{stem}_{digest}.png")
+        try:
+            if thumbnail:
+                return make_thumbnail(pdf_path, image_path)
+            render_pages(pdf_path, (1,), dpi=dpi, size=size)[0].save(image_path, 'PNG')
+            return image_path
+        except Exception as e:
+            print(f"Preview failed for {pdf_path}: {e}")
+            return None
+
+    unique = list(dict.fromkeys(os.path.abspath(p) for p in pdf_paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rendered = dict(zip(unique, executor.map(render, unique)))
+    return [rendered[os.path.abspath(p)] for p in pdf_paths]
@@ -0,0 +1,396 @@
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gemini_client
+from ats_general import analyze_resume
+from ats_job_des import ParsedResume, get_ats_score_from_gemini, parse_ats_score, parse_resume
+from ats_resume_improve import improve_resume_with_gemini
+from ats_resume_rebuild import rebuild_resume_with_gemini
+from latex_renderer import render_latex_resume
+from latex_resume_gen import generate_latex_resume
+from latex_template import latex_template
+from latex_to_pdf import compile_latex_cached
+from models import warm_up
+from text_extraction import SUPPORTED_EXTENSIONS, UnreadableFileError
+
+# Long-running local HTTP service for the scoring and Gemini workflows.
+# Models are loaded once at startup and stay warm; every request runs on a
+# bounded worker pool, and once the pool and its queue are full new requests
+# are turned away with 429 instead of piling up. Bad input gets 400, and a
+# failed Gemini call gets 502. GET /health and /metrics report load and latency. With --stub-gemini (or GEMINI_BACKEND=stub) the
+# Gemini calls are answered by gemini_stub, so the service runs fully offline.
+# Run: python server.py --port 8000
+#      curl -X POST localhost:8000/analyze -d '{"path": "resume.pdf"}'
+
+DEFAULT_WORKERS = int(os.environ.get("RESUME_SERVER_WORKERS", "2"))
+DEFAULT_QUEUE = int(os.environ.get("RESUME_SERVER_QUEUE", "8"))
+REQUEST_TIMEOUT = float(os.environ.get("RESUME_SERVER_TIMEOUT", "300"))
+MAX_BODY_BYTES = int(os.environ.get("RESUME_SERVER_MAX_BODY_MB", "20")) * 1024 * 1024
+LATENCY_WINDOW = 1000
+RETRY_AFTER = 1
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Metrics:
+    """Request counts and a rolling window of latencies per endpoint."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counts = {}
+        self.in_flight = 0
+        self.rejected = 0
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            if status >= 400:
+                counts["errors"] += 1
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, counts in self._counts.items():
+                values = sorted(self._latencies.get(endpoint, ()))
+                endpoints[endpoint] = dict(counts, latency_ms=_percentiles(values))
+            return {"uptime": time.time() - self.started, "in_flight": self.in_flight,
+                    "rejected": self.rejected, "endpoints": endpoints}
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    pick = lambda q: values[min(len(values) - 1, int(round(q * (len(values) - 1))))] * 1000
+    return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": values[-1] * 1000}
+
+
+class ResumeService:
+    """The worker pool, its admission limit and the metrics, shared by all handler threads."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE, timeout=REQUEST_TIMEOUT):
+        self.workers = workers
+        self.queue = queue
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resume-worker")
+        # One slot per running or queued job; a request that can't get one is rejected
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self.metrics = Metrics()
+
+    def submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self.metrics._lock:
+                self.metrics.rejected += 1
+            raise RequestError(429, "Server busy; retry later.")
+        with self.metrics._lock:
+            self.metrics.in_flight += 1
+        try:
+            future = self.executor.submit(func, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise RequestError(504, f"Request did not finish within {self.timeout:.0f}s.")
+
+    def _release(self):
+        with self.metrics._lock:
+            self.metrics.in_flight -= 1
+        self._slots.release()
+
+    def health(self):
+        return {"status": "ok", "workers": self.workers, "queue": self.queue,
+                "in_flight": self.metrics.in_flight,
+                "backend": "stub" if gemini_client._model_factory is not None else "gemini"}
+
+
+# --- REQUEST HELPERS ---
+
+def _api_key(payload, required=True):
+    # genai.configure() is process-wide: a per-request key would switch the
+    # key under other requests' calls in flight, so only the server's key is used
+    if "gemini_api_key" in payload:
+        raise RequestError(400, "Per-request Gemini keys are not accepted; the server uses GEMINI_API_KEY.")
+    key = os.environ.get("GEMINI_API_KEY")
+    if required and not key and gemini_client._model_factory is None:
+        raise RequestError(400, "No Gemini API key: start the server with GEMINI_API_KEY set.")
+    return key
+
+
+def _optional(payload, name, default=""):
+    value = payload.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise RequestError(400, f"'{name}' must be a string.")
+    return value
+
+
+def _required(payload, name):
+    value = _optional(payload, name)
+    if not value.strip():
+        raise RequestError(400, f"Missing '{name}'.")
+    return value
+
+
+def _resume_file(payload):
+    """
+    The resume to work on: {"path": ...} for a file on this machine, or
+    {"file": {"name": ..., "content": base64}} for an upload.
+    Returns:
+        tuple: (file path, temporary path to delete afterwards or None)
+    """
+    upload = payload.get("file")
+    if upload is not None:
+        if not isinstance(upload, dict):
+            raise RequestError(400, "'file' must be an object with 'name' and 'content'.")
+        name, content = upload.get("name"), upload.get("content")
+        if not isinstance(name, str) or not isinstance(content, str):
+            raise RequestError(400, "'file' needs string 'name' and 'content' (base64).")
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise RequestError(400, f"Unsupported file type: {ext or name}")
+        try:
+            content = base64.b64decode(content, validate=True)
+        except ValueError:
+            raise RequestError(400, "File content is not valid base64.")
+        fd, tmp_path = tempfile.mkstemp(prefix="resume_upload_", suffix=ext)
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        return tmp_path, tmp_path
+    path = _required(payload, "path")
+    if not os.path.isfile(path):
+        raise RequestError(404, f"File not found: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise RequestError(400, f"Unsupported file type: {ext or path}")
+    return path, None
+
+
+@contextmanager
+def _reading():
+    # A corrupt upload (or a file that isn't what its extension says) is bad input
+    try:
+        yield
+    except UnreadableFileError as e:
+        raise RequestError(400, str(e))
+
+
+def _resume(payload):
+    """The request's resume as a ParsedResume; an uploaded file is deleted once read."""
+    # Sectioned text ("resume_text") skips extraction altogether
+    if payload.get("resume_text") is not None:
+        return ParsedResume.from_text(_required(payload, "resume_text"))
+    path, tmp_path = _resume_file(payload)
+    try:
+        with _reading():
+            return parse_resume(path)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+# --- ENDPOINTS ---
+
+def handle_analyze(payload):
+    path, tmp_path = _resume_file(payload)
+    try:
+        extraction = {}
+        with _reading():
+            result = analyze_resume(path, stats=extraction)
+        result["extraction"] = extraction
+        return result
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+def handle_score(payload):
+    job_description = _required(payload, "job_description")
+    key = _api_key(payload)
+    feedback = get_ats_score_from_gemini(_resume(payload), job_description, key)
+    return {"score": parse_ats_score(feedback), "feedback": feedback}
+
+
+def handle_improve(payload):
+    key = _api_key(payload)
+    return {"resume": improve_resume_with_gemini(_resume(payload), _optional(payload, "job_description"), key)}
+
+
+def handle_rebuild(payload):
+    job_title = _required(payload, "job_title")
+    job_description = _required(payload, "job_description")
+    key = _api_key(payload)
+    # Gap questions can't be asked interactively: "answers" are used in order,
+    # and any question left without one gets a Gemini-written example
+    answers = payload.get("answers") or []
+    if not isinstance(answers, list):
+        raise RequestError(400, "'answers' must be a list of strings.")
+    answers = list(answers)
+    questions = []
+
+    def answer_gap(question):
+        questions.append(question)
+        answer = answers.pop(0) if answers else None
+        return answer.strip() if isinstance(answer, str) and answer.strip() else None
+
+    rebuilt = rebuild_resume_with_gemini(_resume(payload), job_title, job_description, key,
+                                         answer_gap=answer_gap)
+    return {"resume": rebuilt, "questions": questions}
+
+
+def handle_latex(payload):
+    resume_text = _required(payload, "resume_text")
+    template = _optional(payload, "template") or latex_template
+    key = _api_key(payload, required=False)
+    render_stats = {}
+    latex_code = render_latex_resume(resume_text, template, key, stats=render_stats)
+    rendered = "local"
+    # Gemini writes the whole document when any line didn't fit the local layout
+    if not latex_code or render_stats["unplaced"]:
+        latex_code = generate_latex_resume(template, resume_text, _api_key(payload))
+        rendered = "gemini"
+        if not latex_code:
+            raise RequestError(502, "Gemini did not return LaTeX code.")
+    result = {"latex": latex_code, "rendered": rendered}
+    if payload.get("compile"):
+        compiled = compile_latex_cached(latex_code)
+        result["pdf"] = base64.b64encode(compiled["pdf_bytes"]).decode("ascii") if compiled["ok"] else None
+        result["compile"] = {"ok": compiled["ok"], "pages": compiled["pages"], "seconds": compiled["seconds"],
+                             "cached": compiled.get("cached", False)}
+        if not compiled["ok"]:
+            result["compile"]["log"] = compiled["log"][-2000:]
+    return result
+
+
+ENDPOINTS = {
+    "/analyze": handle_analyze,
+    "/score": handle_score,
+    "/improve": handle_improve,
+    "/rebuild": handle_rebuild,
+    "/latex": handle_latex,
+}
+
+
+class ResumeHandler(BaseHTTPRequestHandler):
+    service = None
+    server_version = "ResumeEnhancer/1.0"
+
+    def _send_json(self, status, body, headers=()):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_payload(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, "Request body too large.")
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise RequestError(400, "Request body must be JSON.")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "Request body must be a JSON object.")
+        return payload
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.service.health())
+        elif self.path == "/metrics":
+            self._send_json(200, self.service.metrics.snapshot())
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        handler = ENDPOINTS.get(self.path)
+        if handler is None:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        start = time.perf_counter()
+        status, headers = 200, ()
+        try:
+            body = self.service.submit(handler, self._read_payload())
+        except RequestError as e:
+            status, body = e.status, {"error": str(e)}
+            if e.status == 429:
+                headers = (("Retry-After", str(RETRY_AFTER)),)
+        except gemini_client.GeminiError as e:
+            print(f"Error handling {self.path}: {e}", file=sys.stderr)
+            status, body = 502, {"error": str(e)}
+        except FileNotFoundError as e:
+            status, body = 404, {"error": str(e)}
+        except Exception as e:
+            print(f"Error handling {self.path}: {e}", file=sys.stderr)
+            status, body = 500, {"error": str(e)}
+        self._send_json(status, body, headers)
+        if status != 429:
+            self.service.metrics.record(self.path, status, time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        if os.environ.get("RESUME_SERVER_LOG"):
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8000, workers=DEFAULT_WORKERS, queue=DEFAULT_QUEUE):
+    service = ResumeService(workers=workers, queue=queue)
+    handler = type("Handler", (ResumeHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP service for resume scoring and rewriting.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Jobs run at once")
+    parser.add_argument("-q", "--queue", type=int, default=DEFAULT_QUEUE,
+                        help="Jobs allowed to wait for a worker before requests get 429")
+    parser.add_argument("--stub-gemini", action="store_true", help="Answer Gemini calls with gemini_stub (offline)")
+    parser.add_argument("--no-ocr", action="store_true", help="Don't preload EasyOCR (image resumes load it on first use)")
+    args = parser.parse_args()
+
+    if args.stub_gemini or os.environ.get("GEMINI_BACKEND") == "stub":
+        from gemini_stub import StubModel
+        gemini_client.set_model_factory(StubModel)
+    start = time.perf_counter()
+    warm_up(("nlp_scoring",) if args.no_ocr else ("nlp_scoring", "reader"))
+    print(f"Models loaded in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    server = make_server(args.host, args.port, workers=args.workers, queue=args.queue)
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"({args.workers} workers, queue {args.queue})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import unittest
+
+from ats_job_des import ParsedResume
+
+SECTIONED = """Jane Doe
+jane@example.com
+--- SKILLS ---
+Python, SQL
+--- WORK EXPERIENCE ---
+Developer | Initech | 2020 - 2023
+- Built the billing service.
+"""
+
+
+class FromTextTest(unittest.TestCase):
+    def test_sectioned_text_keeps_its_blocks(self):
+        resume = ParsedResume.from_text(SECTIONED)
+        self.assertEqual(list(resume.sections), ["Other", "Skills", "Work Experience"])
+        self.assertEqual(resume.sections["Skills"], "Python, SQL")
+        self.assertNotIn("--- SKILLS ---", resume.sections["Other"])
+
+    def test_formatted_text_round_trips(self):
+        resume = ParsedResume.from_text(SECTIONED)
+        self.assertEqual(ParsedResume.from_text(resume.formatted).sections, resume.sections)
+
+    def test_plain_text_is_split_on_headers(self):
+        resume = ParsedResume.from_text("Jane Doe\nSkills\nPython")
+        self.assertEqual(resume.sections, {"Other": "Jane Doe", "Skills": "Python"})
+
+
+if __name__ == "__main__":
+    unittest.main()
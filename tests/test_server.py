@@ -0,0 +1,92 @@
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+import zipfile
+
+os.environ.setdefault("RESUME_CACHE_DIR", tempfile.mkdtemp(prefix="resume_test_cache_"))
+
+import gemini_client
+import server
+from gemini_stub import StubModel
+
+# Bad input to the HTTP service must come back as 400, not as a 500 from deep
+# inside the extractors. Runs offline against the Gemini stub:
+#   python -m unittest discover tests
+
+
+def _docx_without_document():
+    # A valid zip that isn't a Word document
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("readme.txt", "not a resume")
+    return buffer.getvalue()
+
+
+class BadInputTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        gemini_client.set_model_factory(StubModel)
+        cls.httpd = server.make_server(port=0, workers=1, queue=2)
+        threading.Thread(target=cls.httpd.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.httpd.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+        cls.httpd.RequestHandlerClass.service.executor.shutdown(wait=False)
+        gemini_client.set_model_factory(None)
+
+    def post(self, path, body):
+        request = urllib.request.Request(self.base + path, json.dumps(body).encode("utf-8"),
+                                         {"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def upload(self, path, name, content, **fields):
+        return self.post(path, dict(fields, file={"name": name, "content": base64.b64encode(content).decode("ascii")}))
+
+    def test_pdf_that_is_not_a_pdf(self):
+        status, body = self.upload("/analyze", "resume.pdf", b"plain text, not a PDF")
+        self.assertEqual(status, 400)
+        self.assertIn("as .pdf", body["error"])
+
+    def test_docx_that_is_not_a_zip(self):
+        status, body = self.upload("/analyze", "resume.docx", b"plain text, not a zip")
+        self.assertEqual(status, 400)
+        self.assertIn("zip", body["error"])
+
+    def test_docx_without_document_part(self):
+        status, body = self.upload("/analyze", "resume.docx", _docx_without_document())
+        self.assertEqual(status, 400)
+        self.assertIn("document.xml", body["error"])
+
+    def test_corrupt_upload_to_gemini_endpoint(self):
+        status, _ = self.upload("/score", "resume.pdf", b"%PDF-1.4 truncated", job_description="Python developer")
+        self.assertEqual(status, 400)
+
+    def test_job_description_must_be_text(self):
+        for value in (42, ["Python"], {"text": "Python"}):
+            for path in ("/score", "/improve", "/rebuild"):
+                status, body = self.post(path, {"resume_text": "--- SKILLS ---\nPython", "job_title": "Developer",
+                                                "job_description": value})
+                self.assertEqual(status, 400, (path, value))
+                self.assertIn("job_description", body["error"])
+
+    def test_per_request_key_is_refused(self):
+        status, body = self.post("/improve", {"resume_text": "--- SKILLS ---\nPython", "gemini_api_key": "other-key"})
+        self.assertEqual(status, 400)
+        self.assertIn("GEMINI_API_KEY", body["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
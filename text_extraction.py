@@ -0,0 +1,97 @@
+import os
+import time
+from xml.etree.ElementTree import ParseError
+from zipfile import BadZipFile
+from PIL import UnidentifiedImageError
+from pdfminer.psparser import PSException
+from docx_reader import read_docx
+from disk_cache import DiskCache, hash_file
+from ocr import ocr_image, ocr_settings
+from pdf_text import extract_pdf_text, pdf_settings
+from tracing import stage
+
+# Raw text extraction shared by ats_general and ats_job_des. Results are cached
+# on disk by file content, so rescoring a resume skips pdfminer/docx/OCR.
+
+# Bump whenever the extraction output changes, so stale cache entries miss.
+EXTRACTOR_VERSION = "4"
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".bmp", ".tiff"]
+SUPPORTED_EXTENSIONS = [".pdf", ".docx"] + IMAGE_EXTENSIONS
+
+# What the PDF, DOCX and image readers raise for a damaged file, or one whose
+# contents don't match its extension (KeyError: a zip without word/document.xml)
+READER_ERRORS = (PSException, BadZipFile, KeyError, ParseError, UnidentifiedImageError)
+
+
+class UnreadableFileError(ValueError):
+    """The file is damaged or is not the type its extension says."""
+
+
+text_cache = DiskCache("text", max_bytes=int(os.environ.get("RESUME_TEXT_CACHE_MB", "256")) * 1024 * 1024,
+                       suffix=".txt")
+
+
+def _extract(file_path, ext, stats):
+    try:
+        if ext == ".pdf":
+            # Scanned pages (no text layer) fall back to OCR
+            return extract_pdf_text(file_path, stats=stats)
+        elif ext == ".docx":
+            return "\n".join(read_docx(file_path)["paragraphs"])
+        else:
+            # OCR for image files using EasyOCR (normalised and downscaled first)
+            return ocr_image(file_path)
+    except READER_ERRORS as e:
+        raise UnreadableFileError(f"Could not read {os.path.basename(file_path)} as {ext}: {e}") from e
+
+
+def extract_raw_text(file_path, use_cache=True, stats=None):
+    """
+    Extract the text of a PDF, DOCX or image resume, reusing a cached result
+    when the same file contents were extracted before.
+    Args:
+        file_path (str): Path to the resume file.
+        use_cache (bool): Set to False to always re-run the extractor.
+        stats (dict): Optional; receives "seconds" and "cached", and for PDFs the
+            page counts and OCR fallback time from extract_pdf_text().
+    Returns:
+        str: The extracted text, unmodified.
+    Raises:
+        UnreadableFileError: The file is damaged or not really a PDF/DOCX/image.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError("Unsupported file type. Only PDF, DOCX, and image files are supported.")
+    stats = {} if stats is None else stats
+    with stage("extract", ext=ext) as attrs:
+        text = _extract_cached(file_path, ext, use_cache, stats)
+        attrs.update(cached=stats["cached"], chars=len(text))
+    return text
+
+
+def _extract_cached(file_path, ext, use_cache, stats):
+    start = time.perf_counter()
+    stats["cached"] = False
+    if not use_cache:
+        text = _extract(file_path, ext, stats)
+        stats["seconds"] = time.perf_counter() - start
+        return text
+    # PDF page cap, layout mode and the OCR image size change the text, so they are part of the key
+    extra = ()
+    if ext == ".pdf":
+        extra = (pdf_settings(), ocr_settings())  # scanned pages go through OCR too
+    elif ext in IMAGE_EXTENSIONS:
+        extra = (ocr_settings(),)
+    key = hash_file(file_path, ext, EXTRACTOR_VERSION, *extra)
+    cached = text_cache.get(key)
+    if cached is not None:
+        stats["cached"] = True
+        stats["seconds"] = time.perf_counter() - start
+        return cached.decode("utf-8")
+    text = _extract(file_path, ext, stats)
+    text_cache.put(key, text.encode("utf-8"))
+    stats["seconds"] = time.perf_counter() - start
+    return text
+
+def cache_stats():
+    return text_cache.stats()
@@ -0,0 +1,195 @@
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Opt-in per-stage tracing. While a session is active, every stage() block
+# records wall time, CPU time (of its thread) and, if enabled, peak traced
+# memory, nested under the stage that was open in the same thread. With no
+# session, stage() does nothing beyond one check. Spans can be written as
+# plain JSON or as a Chrome trace (chrome://tracing, Perfetto).
+
+_lock = threading.Lock()
+_local = threading.local()
+_session = None
+
+
+class TraceSession:
+    def __init__(self, memory=True, profile=False):
+        self.memory = memory
+        self.spans = []
+        self.started = time.perf_counter()
+        self.profiler = cProfile.Profile() if profile else None
+        self._started_tracemalloc = False
+        self._next_id = 0
+
+    def new_id(self):
+        with _lock:
+            self._next_id += 1
+            return self._next_id
+
+    def add(self, span):
+        with _lock:
+            self.spans.append(span)
+
+    def to_dict(self):
+        with _lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+        return {"duration": time.perf_counter() - self.started, "spans": spans}
+
+    def totals(self):
+        """Total wall seconds per stage name (nested stages also count in their parents)."""
+        totals = {}
+        for span in self.to_dict()["spans"]:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["wall"]
+        return totals
+
+
+def start(memory=True, profile=False):
+    """
+    Start recording stages.
+    Args:
+        memory (bool): Record peak traced memory per stage (tracemalloc; slows
+            Python-heavy code noticeably, and concurrent stages share one counter).
+        profile (bool): Also run cProfile in the calling thread until stop().
+    Returns:
+        TraceSession: The active session.
+    """
+    global _session
+    session = TraceSession(memory=memory, profile=profile)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        session._started_tracemalloc = True
+    if session.profiler:
+        session.profiler.enable()
+    _session = session
+    return session
+
+
+def stop():
+    """Stop recording; returns the finished TraceSession (or None if none was active)."""
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return None
+    if session.profiler:
+        session.profiler.disable()
+    if session._started_tracemalloc:
+        tracemalloc.stop()
+    return session
+
+
+def active():
+    return _session is not None
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def stage(name, **attrs):
+    """Record a stage; yields its attribute dict, which the block can still fill in."""
+    session = _session
+    if session is None:
+        yield {}
+        return
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    span = {"id": session.new_id(), "parent": parent["id"] if parent else None, "name": name,
+            "thread": threading.current_thread().name, "start": time.perf_counter() - session.started,
+            "attrs": dict(attrs)}
+    memory = session.memory and tracemalloc.is_tracing()
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent["_peak"] = max(parent.get("_peak", 0), peak)
+        tracemalloc.reset_peak()
+        span["_base"], span["_peak"] = current, current
+    stack.append(span)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield span["attrs"]
+    finally:
+        span["wall"] = time.perf_counter() - wall
+        span["cpu"] = time.thread_time() - cpu
+        # Coroutines sharing a thread can finish out of order
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i] is span:
+                del stack[i]
+                break
+        if memory and tracemalloc.is_tracing():
+            peak = max(span.pop("_peak"), tracemalloc.get_traced_memory()[1])
+            span["peak_bytes"] = peak - span.pop("_base")
+            if parent is not None:
+                parent["_peak"] = max(parent.get("_peak", 0), peak)
+        else:
+            span.pop("_peak", None)
+            span.pop("_base", None)
+        session.add(span)
+
+
+def record_span(name, start, wall, **attrs):
+    """Add a stage measured by the caller (e.g. across a generator's yields); start is a perf_counter() value."""
+    session = _session
+    if session is None:
+        return
+    stack = _stack()
+    session.add({"id": session.new_id(), "parent": stack[-1]["id"] if stack else None, "name": name,
+                 "thread": threading.current_thread().name, "start": start - session.started,
+                 "wall": wall, "cpu": None, "attrs": attrs})
+
+
+def write_json(session, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(session.to_dict(), f, indent=2, default=str)
+
+
+def write_chrome_trace(session, path):
+    """Write spans in the Chrome trace event format (complete "X" events, microseconds)."""
+    threads = {}
+    events = []
+    for span in session.to_dict()["spans"]:
+        tid = threads.setdefault(span["thread"], len(threads) + 1)
+        args = dict(span["attrs"], cpu=span["cpu"])
+        if "peak_bytes" in span:
+            args["peak_bytes"] = span["peak_bytes"]
+        events.append({"name": span["name"], "ph": "X", "pid": os.getpid(), "tid": tid,
+                       "ts": span["start"] * 1e6, "dur": span["wall"] * 1e6, "args": args})
+    events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+               for name, tid in threads.items()]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events}, f, default=str)
+
+
+def write_profile(session, path):
+    """Dump the cProfile data (open with pstats or snakeviz)."""
+    if session.profiler:
+        session.profiler.dump_stats(path)
+
+
+def start_from_env():
+    """Start tracing if RESUME_TRACE, RESUME_TRACE_CHROME or RESUME_PROFILE is set; returns the session or None."""
+    if not any(os.environ.get(name) for name in ("RESUME_TRACE", "RESUME_TRACE_CHROME", "RESUME_PROFILE")):
+        return None
+    return start(memory=os.environ.get("RESUME_TRACE_MEMORY", "on").lower() != "off",
+                 profile=bool(os.environ.get("RESUME_PROFILE")))
+
+
+def stop_and_write_from_env():
+    """Stop tracing and write the files named by the environment variables above."""
+    session = stop()
+    if session is None:
+        return
+    outputs = [("RESUME_TRACE", write_json), ("RESUME_TRACE_CHROME", write_chrome_trace),
+               ("RESUME_PROFILE", write_profile)]
+    for name, writer in outputs:
+        path = os.environ.get(name)
+        if path:
+            writer(session, path)
+            print(f"Trace written: {path}")